@@ -1,32 +1,104 @@
 import base64
-from typing import List
+from typing import List, Optional
 from krypto.actions import action
-from .rotors import rotors_encrypt, rotor_reverse_init, turn_rotors
+from .rotors import (
+    RotorCache,
+    notch_carries,
+    rotor_reverse_init,
+    rotor_schedule,
+    rotors_encrypt,
+    seek_rotors,
+    turn_rotors,
+)
+from .stream import (
+    STREAM_CHUNK_SIZE,
+    b64decode_chunks,
+    b64encode_chunks,
+    bytenigma_stream,
+)
+from .vectorized import bytenigma_vectorized
+
+
+def bytenigma_loop(
+    rotors: List[List[int]],
+    inp: bytes,
+    offset: int = 0,
+    cache: Optional[RotorCache] = None,
+) -> bytes:
+    """Encrypts the input with the given rotors, one byte at a time
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        inp (bytes): The input to be encrypted
+        offset (int, optional): byte position of the input in the stream. Defaults to 0.
+        cache (Optional[RotorCache], optional): tables of the rotors, shared between calls
+            with the same rotors. Defaults to a new RotorCache.
+
+    Returns:
+        bytes: The encrypted output
+    """
+    cache = RotorCache(rotors) if cache is None else cache
+    final_output = bytearray(len(inp))
+    # only the first rotor moves within a run, the rest is one cached table
+    for start, length, turn_list in rotor_schedule(
+        rotors, len(inp), seek_rotors(rotors, offset)
+    ):
+        run = inp[start : start + length]
+        final_output[start : start + length] = cache.encrypt_run(turn_list, run)
+    return bytes(final_output)
+
+
+ENGINES = {
+    "loop": bytenigma_loop,
+    "numpy": bytenigma_vectorized,
+}
+"""dict: available bytenigma engines, all of them give the same output"""
 
 
 @action("bytenigma")
-def bytenigma(rotors: List[List[int]], input: str) -> dict:
+def bytenigma(
+    rotors: List[List[int]],
+    input: str,
+    engine: str = "loop",
+    offset: int = 0,
+    workers: int = 1,
+) -> dict:
     """Encrypts the input with the given rotors
 
     Args:
         rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
         input (str): The input to be encrypted in base64
+        engine (str, optional): The engine to be used, one of ENGINES. Defaults to "loop".
+        offset (int, optional): byte position of the input in the encrypted stream,
+            allows en-/decrypting a slice of a stream on its own. Defaults to 0.
+        workers (int, optional): number of processes for large inputs. Defaults to 1.
 
     Returns:
         dict: dictionary containg the encrypted output in base64
     """
-    inp = base64.b64decode(input)
-    # init reverse rotors
-    reverse_rotors = rotor_reverse_init(rotors)
-    final_output = []
-    turn_list: List[int] = [0] * len(rotors)
-    # send input(single byte) through rotors
-    for byte in inp:
-        # returns one encrypted byte int
-        output = rotors_encrypt(rotors, reverse_rotors, turn_list, byte)
-        # append output to output list
-        final_output.append(output)
-        # turn rotors
-        turn_rotors(rotors, turn_list)
-
-    return {"output": base64.b64encode(bytes(final_output)).decode()}
+    if engine not in ENGINES:
+        raise KeyError("Unknown bytenigma engine: " + engine)
+    # decode, encrypt and encode chunk by chunk, so memory stays bounded by the chunk size
+    chunks = b64decode_chunks(input, STREAM_CHUNK_SIZE * max(1, workers))
+    output = bytenigma_stream(ENGINES[engine], rotors, chunks, offset, workers)
+    return {"output": "".join(b64encode_chunks(output))}
+
+
+@action("bytenigma-batch")
+def bytenigma_batch(rotors: List[List[int]], inputs: List[dict]) -> dict:
+    """Encrypts several inputs with the same rotors, sharing the rotor tables
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        inputs (List[dict]): the inputs, each with "input" in base64 and an optional "offset"
+
+    Returns:
+        dict: dictionary containing the encrypted outputs in base64, in input order
+    """
+    cache = RotorCache(rotors)
+    outputs = []
+    for message in inputs:
+        inp = base64.b64decode(message["input"])
+        output = bytenigma_loop(rotors, inp, message.get("offset", 0), cache)
+        outputs.append(base64.b64encode(output).decode())
+    return {"outputs": outputs}
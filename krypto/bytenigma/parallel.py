@@ -0,0 +1,43 @@
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import repeat
+from typing import Callable, List, Optional
+
+PARALLEL_THRESHOLD = 1 << 20
+"""int: inputs smaller than this many bytes are encrypted in a single process"""
+
+
+def bytenigma_parallel(
+    engine: Callable[[List[List[int]], bytes, int], bytes],
+    rotors: List[List[int]],
+    inp: bytes,
+    offset: int = 0,
+    workers: int = 1,
+    executor: Optional[Executor] = None,
+) -> bytes:
+    """Encrypts the input in chunks, spread over a pool of processes
+
+    Every chunk derives its starting rotor state from its offset, so the chunks
+    are independent of each other and are joined in order afterwards.
+
+    Args:
+        engine (Callable[[List[List[int]], bytes, int], bytes]): the engine encrypting a chunk
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        inp (bytes): The input to be encrypted
+        offset (int, optional): byte position of the input in the stream. Defaults to 0.
+        workers (int, optional): number of processes. Defaults to 1.
+        executor (Optional[Executor], optional): pool to reuse across calls, a new
+            pool is started and shut down if None. Defaults to None.
+
+    Returns:
+        bytes: The encrypted output
+    """
+    if workers <= 1 or len(inp) < PARALLEL_THRESHOLD:
+        return engine(rotors, inp, offset)
+    chunk_size = -(len(inp) // -workers)
+    starts = range(0, len(inp), chunk_size)
+    chunks = [inp[start : start + chunk_size] for start in starts]
+    offsets = [offset + start for start in starts]
+    if executor is not None:
+        return b"".join(executor.map(engine, repeat(rotors), chunks, offsets))
+    with ProcessPoolExecutor(workers) as executor:
+        return b"".join(executor.map(engine, repeat(rotors), chunks, offsets))
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 
 
 def turn_rotors(rotors: List[List[int]], turn_list: List[List[int]]) -> None:
@@ -15,6 +15,93 @@ def turn_rotors(rotors: List[List[int]], turn_list: List[List[int]]) -> None:
             break
 
 
+def rotor_notches(rotor: List[int]) -> List[int]:
+    """Returns the notch positions of a rotor, leaving one of them turns the next rotor
+
+    Args:
+        rotor (List[int]): the rotor
+
+    Returns:
+        List[int]: the positions holding a 0
+    """
+    return [index for index, value in enumerate(rotor) if value == 0]
+
+
+def notch_carries(rotor: List[int], turn: int, steps):
+    """Counts how often a rotor turns the next rotor while advancing the given steps
+
+    Works for an int as well as for a numpy array of steps.
+
+    Args:
+        rotor (List[int]): the rotor
+        turn (int): the turn of the rotor before advancing
+        steps (int | np.ndarray): number of times the rotor advances
+
+    Returns:
+        int | np.ndarray: number of times the next rotor advances
+    """
+    length = len(rotor)
+    carries = 0
+    for notch in rotor_notches(rotor):
+        # the notch is left on advances (notch - turn) % length, + length, + 2 * length, ...
+        carries = carries + (steps - (notch - turn) % length + length - 1) // length
+    return carries
+
+
+def seek_rotors(
+    rotors: List[List[int]], steps: int, turn_list: Optional[List[int]] = None
+) -> List[int]:
+    """Calculates the turn_list after turning the rotors the given number of steps
+
+    Takes time proportional to the number of rotors and notches, not to the steps.
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        steps (int): number of times turn_rotors would be called
+        turn_list (Optional[List[int]], optional): turn_list before turning. Defaults to all zero.
+
+    Returns:
+        List[int]: the turn_list after turning
+    """
+    turn_list = [0] * len(rotors) if turn_list is None else turn_list
+    output: List[int] = []
+    for rotor, turn in zip(rotors, turn_list):
+        output.append((turn + steps) % len(rotor))
+        steps = notch_carries(rotor, turn, steps)
+    return output
+
+
+def rotor_schedule(
+    rotors: List[List[int]], count: int, turn_list: Optional[List[int]] = None
+) -> Iterator[Tuple[int, int, List[int]]]:
+    """Generates the turn_list of every byte position, one run at a time
+
+    Within a run only the first rotor moves, starting at the yielded turn and advancing
+    by one every byte. A run ends when the first rotor leaves a notch.
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        count (int): number of byte positions
+        turn_list (Optional[List[int]], optional): turn_list of the first byte. Defaults to all zero.
+
+    Yields:
+        Tuple[int, int, List[int]]: start and length of the run and the turn_list of its first byte
+    """
+    turn_list = [0] * len(rotors) if turn_list is None else list(turn_list)
+    first_rotor = rotors[0]
+    notches = rotor_notches(first_rotor)
+    start = 0
+    while start < count:
+        length = count - start
+        for notch in notches:
+            length = min(length, (notch - turn_list[0]) % len(first_rotor) + 1)
+        yield start, length, list(turn_list)
+        start += length
+        # move to the last byte of the run, the final turn carries if it leaves a notch
+        turn_list[0] = (turn_list[0] + length - 1) % len(first_rotor)
+        turn_rotors(rotors, turn_list)
+
+
 def rotors_encrypt(
     rotors: List[List[int]],
     reverse_rotors: List[List[int]],
@@ -56,3 +143,76 @@ def rotor_reverse_init(rotors: List[List[int]]) -> List[List[int]]:
             current_output[value] = index
         output.append(current_output)
     return output
+
+
+class RotorCache:
+    """Caches the permutation formed by the inner rotors and the reflector
+
+    Between carries only the first rotor moves, so the path through the rotors
+    1..n-1, the reflector and back is one fixed table. Every rotor k has a table
+    for the path starting at it, which is only rebuilt when rotor k or a rotor
+    behind it turned.
+    """
+
+    def __init__(self, rotors: List[List[int]]):
+        self._rotors = rotors
+        """List[List[int]]: the rotors"""
+
+        self._inverse_rotors = rotor_reverse_init(rotors)[::-1]
+        """List[List[int]]: the inverse of every rotor, in rotor order"""
+
+        self._turn_list: List[Optional[int]] = [None] * len(rotors)
+        """List[Optional[int]]: turn_list the tables were built for"""
+
+        self._tables: List[List[int]] = [[]] * len(rotors) + [
+            [value ^ 0xFF for value in range(len(rotors[-1]))]
+        ]
+        """List[List[int]]: table of the path starting at every rotor, last one is the reflector"""
+
+    def composite(self, turn_list: List[int]) -> List[int]:
+        """Returns the permutation of the inner rotors and the reflector
+
+        Args:
+            turn_list (List[int]): the current turn of the rotors
+
+        Returns:
+            List[int]: table mapping the output of the first rotor to the input of its inverse
+        """
+        # the deepest rotor that turned since the last call, 0 if none did
+        changed = 0
+        for index in range(1, len(self._rotors)):
+            if self._turn_list[index] != turn_list[index]:
+                changed = index
+        for index in range(changed, 0, -1):
+            rotor = self._rotors[index]
+            inverse = self._inverse_rotors[index]
+            following = self._tables[index + 1]
+            turn = turn_list[index]
+            length = len(rotor)
+            self._tables[index] = [
+                (inverse[following[rotor[(value + turn) % length]]] - turn) % length
+                for value in range(len(self._rotors[index - 1]))
+            ]
+            self._turn_list[index] = turn
+        return self._tables[1]
+
+    def encrypt_run(self, turn_list: List[int], inp: bytes) -> bytes:
+        """Encrypts a run of bytes, during which only the first rotor moves
+
+        Args:
+            turn_list (List[int]): turn_list of the first byte
+            inp (bytes): the bytes of the run
+
+        Returns:
+            bytes: the encrypted bytes
+        """
+        composite = self.composite(turn_list)
+        rotor = self._rotors[0]
+        inverse = self._inverse_rotors[0]
+        length = len(rotor)
+        turn = turn_list[0]
+        return bytes(
+            (inverse[composite[rotor[(byte + turn + index) % length]]] - turn - index)
+            % length
+            for index, byte in enumerate(inp)
+        )
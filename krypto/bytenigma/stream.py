@@ -0,0 +1,94 @@
+import base64
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List
+
+from .parallel import bytenigma_parallel
+
+STREAM_CHUNK_SIZE = 3 << 20
+"""int: number of bytes decoded, encrypted and encoded at once, a multiple of 3"""
+
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/=]+")
+"""re.Pattern: a run of base64 alphabet characters, everything else is skipped"""
+
+
+def b64decode_chunks(text: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """Decodes base64 text piece by piece
+
+    Like base64.b64decode, characters outside the base64 alphabet such as line
+    breaks are skipped, so the chunks are counted in alphabet characters.
+
+    Args:
+        text (str): the base64 text
+        chunk_size (int, optional): number of bytes per chunk, a multiple of 3.
+            Defaults to STREAM_CHUNK_SIZE.
+
+    Yields:
+        bytes: the decoded chunks
+    """
+    assert chunk_size % 3 == 0, "chunk_size must be a multiple of 3"
+    step = chunk_size // 3 * 4
+    pieces = []
+    count = 0
+    for match in _BASE64_RUN.finditer(text):
+        position, end = match.span()
+        while end - position >= step - count:
+            cut = position + step - count
+            pieces.append(text[position:cut])
+            yield base64.b64decode("".join(pieces))
+            pieces, count, position = [], 0, cut
+        pieces.append(text[position:end])
+        count += end - position
+    if count:
+        yield base64.b64decode("".join(pieces))
+
+
+def b64encode_chunks(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Encodes bytes to base64 piece by piece
+
+    Bytes that do not fill a group of 3 are held back until the next chunk.
+
+    Args:
+        chunks (Iterable[bytes]): the chunks to encode
+
+    Yields:
+        str: the base64 encoded pieces
+    """
+    rest = b""
+    for chunk in chunks:
+        chunk = rest + chunk
+        end = len(chunk) - len(chunk) % 3
+        rest = chunk[end:]
+        yield base64.b64encode(chunk[:end]).decode()
+    yield base64.b64encode(rest).decode()
+
+
+def bytenigma_stream(
+    engine: Callable[[List[List[int]], bytes, int], bytes],
+    rotors: List[List[int]],
+    chunks: Iterable[bytes],
+    offset: int = 0,
+    workers: int = 1,
+) -> Iterator[bytes]:
+    """Encrypts a stream of chunks, only holding one chunk at a time
+
+    Args:
+        engine (Callable[[List[List[int]], bytes, int], bytes]): the engine encrypting a chunk
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        chunks (Iterable[bytes]): the input chunks
+        offset (int, optional): byte position of the first chunk in the stream. Defaults to 0.
+        workers (int, optional): number of processes, the pool is shared by all chunks.
+            Defaults to 1.
+
+    Yields:
+        bytes: the encrypted chunks
+    """
+    if workers <= 1:
+        for chunk in chunks:
+            yield engine(rotors, chunk, offset)
+            offset += len(chunk)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        for chunk in chunks:
+            yield bytenigma_parallel(engine, rotors, chunk, offset, workers, executor)
+            offset += len(chunk)
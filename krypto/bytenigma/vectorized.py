@@ -0,0 +1,81 @@
+from typing import List
+
+import numpy as np
+
+from .rotors import notch_carries, rotor_reverse_init
+
+BLOCK_SIZE = 1 << 16
+"""int: number of bytes encrypted per numpy pass, keeps the temporary arrays in cache"""
+
+
+def _wrap(values: np.ndarray, length: int) -> np.ndarray:
+    """Reduces rotor indices modulo the rotor length
+
+    Args:
+        values (np.ndarray): the indices
+        length (int): the rotor length
+
+    Returns:
+        np.ndarray: the reduced indices, uint8 indices already wrapped around
+    """
+    return values if values.dtype == np.uint8 else values % length
+
+
+def rotor_positions(
+    rotors: List[List[int]], start: int, count: int, dtype: type = np.int64
+) -> np.ndarray:
+    """Calculates the turn of every rotor for a range of byte positions
+
+    The inner rotors only move when the first rotor passes its notch, so their
+    positions are calculated once per revolution of the first rotor and then spread out.
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        start (int): the first byte position
+        count (int): the number of byte positions
+        dtype (type, optional): dtype of the returned array. Defaults to np.int64.
+
+    Returns:
+        np.ndarray: array of shape (len(rotors), count), the turn_list of every byte position
+    """
+    positions = np.empty((len(rotors), count), dtype=dtype)
+    counts = np.arange(start, start + count, dtype=np.int64)
+    positions[0] = counts % len(rotors[0])
+    if len(rotors) > 1 and count > 0:
+        counts = notch_carries(rotors[0], 0, counts)
+        first = int(counts[0])
+        inner = rotor_positions(rotors[1:], first, int(counts[-1]) - first + 1, dtype)
+        # counts never decrease, so every inner state just repeats for its run of bytes
+        positions[1:] = np.repeat(inner, np.bincount(counts - first), axis=1)
+    return positions
+
+
+def bytenigma_vectorized(rotors: List[List[int]], inp: bytes, offset: int = 0) -> bytes:
+    """Encrypts the input with the given rotors, processing all bytes at once with numpy
+
+    Gives the same output as calling rotors_encrypt and turn_rotors for every byte.
+
+    Args:
+        rotors (List[List[int]]): A list of lists representing the rotors to be used for encryption
+        inp (bytes): The input to be encrypted
+        offset (int, optional): byte position of the input in the stream. Defaults to 0.
+
+    Returns:
+        bytes: The encrypted output
+    """
+    # rotors of length 256 wrap around on their own in uint8 arithmetic
+    dtype = np.uint8 if all(len(rotor) == 256 for rotor in rotors) else np.int64
+    forward = [np.array(rotor, dtype=dtype) for rotor in rotors]
+    reverse = [np.array(rotor, dtype=dtype) for rotor in rotor_reverse_init(rotors)]
+    data = np.frombuffer(inp, dtype=np.uint8)
+    output = np.empty(len(data), dtype=np.uint8)
+    for start in range(0, len(data), BLOCK_SIZE):
+        block = data[start : start + BLOCK_SIZE].astype(dtype)
+        positions = rotor_positions(rotors, offset + start, len(block), dtype)
+        for rotor, turns in zip(forward, positions):
+            block = rotor[_wrap(block + turns, len(rotor))]
+        block ^= 0xFF
+        for rotor, turns in zip(reverse, positions[::-1]):
+            block = _wrap(rotor[block] - turns, len(rotor))
+        output[start : start + len(block)] = block
+    return output.tobytes()
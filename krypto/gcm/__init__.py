@@ -1,6 +1,8 @@
 from krypto.actions import action
 import base64
-from typing import List
+import contextlib
+import sys
+from typing import List, Optional
 from .polynom import Polynom
 from .aesgcm import AESGCM
 from .meta_polynom import MetaPolynom
@@ -53,19 +55,57 @@ def gcm_clmul(a: str, b: str) -> dict:
     return {"a_times_b": base64.b64encode(result).decode()}
 
 
+STREAM_CHUNK_SIZE = 1 << 20
+"""int: number of bytes read and encrypted at once in the streaming mode of gcm-encrypt"""
+
+
 @action("gcm-encrypt")
-def gcm_encrypt(key: str, nonce: str, associated_data: str, plaintext: str) -> dict:
+def gcm_encrypt(
+    key: str,
+    nonce: str,
+    associated_data: str,
+    plaintext: Optional[str] = None,
+    plaintext_file: Optional[str] = None,
+    ciphertext_file: Optional[str] = None,
+) -> dict:
     """Encrypts the plaintext with the given key, nonce and associated data
 
+    With plaintext_file, the plaintext is streamed from that file instead, so it
+    never has to fit into memory.
+
     Args:
         key (str): The key to be used for encryption
         nonce (str): The nonce to be used for encryption
         associated_data (str): The associated data to be used for encryption
-        plaintext (str): The plaintext to be encrypted
+        plaintext (Optional[str], optional): The plaintext to be encrypted. Defaults to None.
+        plaintext_file (Optional[str], optional): Path of a raw plaintext file, "-" for stdin,
+            instead of plaintext. Defaults to None.
+        ciphertext_file (Optional[str], optional): Path the raw ciphertext is written to,
+            required with plaintext_file, it is not returned then. Defaults to None.
+
+    Raises:
+        ValueError: if not exactly one of plaintext and plaintext_file is given, or if
+            ciphertext_file is given without plaintext_file or missing with it
 
     Returns:
         dict: dictionary containing the ciphertext, auth_tag, Y0 and H
     """
+    if (plaintext is None) == (plaintext_file is None):
+        raise ValueError(
+            "gcm-encrypt needs exactly one of plaintext and plaintext_file"
+        )
+    if (plaintext_file is None) != (ciphertext_file is None):
+        raise ValueError(
+            "gcm-encrypt needs ciphertext_file exactly with plaintext_file"
+        )
+    if plaintext_file is not None:
+        return gcm_encrypt_stream(
+            base64.b64decode(key),
+            base64.b64decode(nonce),
+            base64.b64decode(associated_data),
+            plaintext_file,
+            ciphertext_file,
+        )
     gcm = AESGCM(
         base64.b64decode(key),
         base64.b64decode(nonce),
@@ -84,6 +124,69 @@ def gcm_encrypt(key: str, nonce: str, associated_data: str, plaintext: str) -> d
     }
 
 
+@action("gcm-decrypt")
+def gcm_decrypt(
+    key: str, nonce: str, associated_data: str, ciphertext: str, auth_tag: str
+) -> dict:
+    """Verifies the auth tag and decrypts the ciphertext with the given key and nonce
+
+    Args:
+        key (str): The key to be used for decryption
+        nonce (str): The nonce to be used for decryption
+        associated_data (str): The associated data the auth tag covers
+        ciphertext (str): The ciphertext to be decrypted
+        auth_tag (str): The received auth tag
+
+    Returns:
+        dict: dictionary containing authentic and, if authentic, the plaintext
+    """
+    gcm = AESGCM(
+        base64.b64decode(key),
+        base64.b64decode(nonce),
+        base64.b64decode(associated_data),
+    )
+    plaintext = gcm.decrypt(base64.b64decode(ciphertext), base64.b64decode(auth_tag))
+    if plaintext is None:
+        return {"authentic": False}
+    return {"authentic": True, "plaintext": base64.b64encode(plaintext).decode()}
+
+
+def gcm_encrypt_stream(
+    key: bytes,
+    nonce: bytes,
+    associated_data: bytes,
+    plaintext_file: str,
+    ciphertext_file: str,
+) -> dict:
+    """Encrypts a plaintext file chunk by chunk with constant memory
+
+    Args:
+        key (bytes): The key to be used for encryption
+        nonce (bytes): The nonce to be used for encryption
+        associated_data (bytes): The associated data to be used for encryption
+        plaintext_file (str): Path of the raw plaintext, "-" for stdin
+        ciphertext_file (str): Path the raw ciphertext is written to
+
+    Returns:
+        dict: dictionary containing auth_tag, Y0 and H
+    """
+    gcm = AESGCM(key, nonce)
+    gcm.update_aad(associated_data)
+    source = (
+        contextlib.nullcontext(sys.stdin.buffer)
+        if plaintext_file == "-"
+        else open(plaintext_file, "rb")
+    )
+    with source as plaintext, open(ciphertext_file, "wb") as ciphertext:
+        while chunk := plaintext.read(STREAM_CHUNK_SIZE):
+            ciphertext.write(gcm.update(chunk))
+    return {
+        "auth_tag": base64.b64encode(gcm.finalize()).decode(),
+        "Y0": base64.b64encode(gcm.y0).decode(),
+        "H": base64.b64encode(gcm.auth_key).decode(),
+    }
+
+
 def base64_to_MetaPolynom(a: List[str]) -> MetaPolynom:
     """Converts a list of base64 encoded polynomials to a MetaPolynom
 
@@ -165,7 +268,9 @@ def gcm_poly_powmod(base: List[str], exponent: int, modulo: List[str]) -> dict:
 
 
 @action("gcm-recover")
-def gcm_recover(nonce: str, msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> dict:
+def gcm_recover(
+    nonce: str, msg1: dict, msg2: dict, msg3: dict, msg4: dict, workers: int = 1
+) -> dict:
     """Recovers the auth_tag of a message encrypted with GCM
 
     Args:
@@ -174,6 +279,7 @@ def gcm_recover(nonce: str, msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> d
         msg2 (dict): The second message
         msg3 (dict): The third message
         msg4 (dict): The fourth message without auth_tag
+        workers (int, optional): number of processes finding the zeros. Defaults to 1.
 
     Returns:
         dict: dictionary containing the recovered plaintext
@@ -192,5 +298,5 @@ def gcm_recover(nonce: str, msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> d
     msg2 = base64_msg_decode(msg2)
     msg3 = base64_msg_decode(msg3)
     msg4 = base64_msg_decode(msg4)
-    msg4_tag = cantor.gcm_recover(msg1, msg2, msg3, msg4)
+    msg4_tag = cantor.gcm_recover(msg1, msg2, msg3, msg4, workers)
     return {"msg4_tag": base64.b64encode(msg4_tag).decode()}
@@ -1,12 +1,246 @@
+import hmac
+from collections import OrderedDict
+from typing import List, Optional
+
 from . import polynom
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 
+MAX_PLAINTEXT_LENGTH = (2**32 - 2) * 16
+"""int: GCM limit on the plaintext length in bytes, the 32 bit counter never wraps below it"""
+
+
+def ghash_keys(
+    auth_key: polynom.Polynom, lanes: int = 1
+) -> List[polynom.PolynomMultiplier]:
+    """Precomputes the multipliers for the powers H^1 to H^lanes of the auth key
+
+    Args:
+        auth_key (polynom.Polynom): the auth key H
+        lanes (int, optional): number of blocks GHash processes per step. Defaults to 1.
+
+    Returns:
+        List[polynom.PolynomMultiplier]: the multiplier for H^(i+1) at index i
+    """
+    assert lanes >= 1, "GHASH needs at least one lane"
+    keys = [polynom.PolynomMultiplier(auth_key)]
+    for _ in range(lanes - 1):
+        keys.append(polynom.PolynomMultiplier(keys[-1].multiply(auth_key)))
+    return keys
+
+
+class GHash:
+    """Running GHASH accumulator, fed with data of any length
+
+    With more than one auth key power, k blocks X_1..X_k are absorbed per step
+    as (Y + X_1)·H^k + X_2·H^(k-1) + ... + X_k·H instead of k dependent Horner
+    steps. The products are independent of each other and the result is the same.
+    """
+
+    def __init__(self, auth_keys: List[polynom.PolynomMultiplier]):
+        self._auth_keys = auth_keys[::-1]
+        """List[polynom.PolynomMultiplier]: multipliers for H^k down to H^1"""
+
+        self._adder = polynom.Polynom(0)
+        """polynom.Polynom: the hash of all complete blocks so far"""
+
+        self._partial = b""
+        """bytes: the bytes of an incomplete block, less than 16"""
+
+    def _absorb(self, data: bytes) -> None:
+        """adds blocks to the hash, a last incomplete block is zero padded
+
+        Args:
+            data (bytes): the blocks
+        """
+        adder = self._adder
+        blocks = polynom.Polynom.from_blocks(data)
+        lanes = len(self._auth_keys)
+        aggregated = len(blocks) - len(blocks) % lanes if lanes > 1 else 0
+        for index in range(0, aggregated, lanes):
+            blocks[index] += adder
+            adder = polynom.Polynom(0)
+            for auth_key, block in zip(self._auth_keys, blocks[index : index + lanes]):
+                adder += auth_key.multiply(block)
+        auth_key = self._auth_keys[-1]
+        for block in blocks[aggregated:]:
+            adder = auth_key.multiply(adder + block)
+        self._adder = adder
+
+    def update(self, data: bytes) -> None:
+        """adds data to the hash, keeping an incomplete last block for the next call
+
+        Args:
+            data (bytes): the data
+        """
+        if self._partial:
+            missing = 16 - len(self._partial)
+            self._partial += data[:missing]
+            data = data[missing:]
+            if len(self._partial) < 16:
+                return
+            self._absorb(self._partial)
+            self._partial = b""
+        complete = len(data) - len(data) % 16
+        self._absorb(data[:complete])
+        self._partial = data[complete:]
+
+    def pad(self) -> None:
+        """zero pads an incomplete block, e.g. at the end of the associated data"""
+        self._absorb(self._partial)
+        self._partial = b""
+
+    def digest(self, associated_data_length: int, ciphertext_length: int) -> bytes:
+        """pads and adds the length block
+
+        Args:
+            associated_data_length (int): length of the associated data in bytes
+            ciphertext_length (int): length of the ciphertext in bytes
+
+        Returns:
+            bytes: ghash
+        """
+        self.pad()
+        self._absorb(
+            (associated_data_length * 8).to_bytes(length=8, byteorder="big")
+            + (ciphertext_length * 8).to_bytes(length=8, byteorder="big")
+        )
+        return self._adder.to_block()
+
+
+class KeyContext:
+    """AES and GHASH state that only depends on the key"""
+
+    def __init__(self, key: bytes):
+        self.aes = algorithms.AES(key)
+        """algorithms.AES: the block cipher, shared by all modes"""
+
+        self.ecb = Cipher(self.aes, modes.ECB()).encryptor()
+        """CipherContext: ECB encryptor for single blocks"""
+
+        self.auth_key = self.ecb.update(b"\x00" * 16)
+        """bytes: auth key, encrypted Null block"""
+
+        self._ghash_keys = ghash_keys(polynom.Polynom.from_block(self.auth_key))
+        """List[polynom.PolynomMultiplier]: multipliers for H^1 to the most lanes used so far"""
+
+    def ghash_keys(self, lanes: int) -> List[polynom.PolynomMultiplier]:
+        """returns the multipliers for H^1 to H^lanes, computing missing powers once
+
+        Args:
+            lanes (int): number of blocks GHash processes per step
+
+        Returns:
+            List[polynom.PolynomMultiplier]: the multiplier for H^(i+1) at index i
+        """
+        assert lanes >= 1, "GHASH needs at least one lane"
+        auth_key = self._ghash_keys[0].factor
+        while len(self._ghash_keys) < lanes:
+            power = self._ghash_keys[-1].multiply(auth_key)
+            self._ghash_keys.append(polynom.PolynomMultiplier(power))
+        return self._ghash_keys[:lanes]
+
+
+class KeyCache:
+    """Bounded LRU cache of the KeyContext of recently used keys
+
+    Building a KeyContext expands the AES key schedule and the GHASH tables,
+    which costs more than encrypting a short message. Batches and long running
+    processes tend to reuse a few keys, so they get the context from here.
+    """
+
+    def __init__(self, maxsize: int = 32):
+        self._maxsize = maxsize
+        """int: most contexts kept, 0 disables the cache"""
+
+        self._contexts: OrderedDict[bytes, KeyContext] = OrderedDict()
+        """OrderedDict[bytes, KeyContext]: contexts by key, least recently used first"""
+
+        self.hits = 0
+        """int: number of lookups answered from the cache"""
+
+        self.misses = 0
+        """int: number of lookups that had to build a new context"""
+
+    @property
+    def maxsize(self) -> int:
+        """property to get the size limit
+
+        Returns:
+            int: most contexts kept
+        """
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        """changes the size limit, evicting the least recently used contexts if needed
+
+        Args:
+            maxsize (int): most contexts kept, 0 disables the cache
+        """
+        assert maxsize >= 0, "cache size must not be negative"
+        self._maxsize = maxsize
+        while len(self._contexts) > maxsize:
+            self._contexts.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+    def __contains__(self, key: bytes) -> bool:
+        return key in self._contexts
+
+    def get(self, key: bytes) -> KeyContext:
+        """returns the context of a key, building and caching it on a miss
+
+        Args:
+            key (bytes): the AES key
+
+        Returns:
+            KeyContext: the context of the key
+        """
+        context = self._contexts.get(key)
+        if context is not None:
+            self.hits += 1
+            self._contexts.move_to_end(key)
+            return context
+        self.misses += 1
+        context = KeyContext(key)
+        if self._maxsize > 0:
+            self._contexts[key] = context
+            if len(self._contexts) > self._maxsize:
+                self._contexts.popitem(last=False)
+        return context
+
+    def evict(self, key: Optional[bytes] = None) -> None:
+        """removes the context of a key, or all contexts
+
+        Args:
+            key (Optional[bytes], optional): the key to evict, None for all. Defaults to None.
+        """
+        if key is None:
+            self._contexts.clear()
+        else:
+            self._contexts.pop(key, None)
+
+
+KEY_CACHE = KeyCache()
+"""KeyCache: process wide cache used by AESGCM"""
+
 
 class AESGCM:
-    """Class to encrypt plaintext with AES GCM"""
+    """Class to encrypt plaintext with AES GCM
+
+    Either encrypts the plaintext and associated data given to the constructor in
+    one go, or incrementally with update_aad(), update() and finalize().
+    With lanes > 1, GHASH absorbs that many blocks per step, see GHash.
+    """
 
     def __init__(
-        self, key: bytes, nonce: bytes, associated_data: bytes, plaintext: bytes
+        self,
+        key: bytes,
+        nonce: bytes,
+        associated_data: bytes = b"",
+        plaintext: bytes = b"",
+        lanes: int = 1,
     ):
         self._associated_data = associated_data
         """bytes: associated data of any length"""
@@ -14,15 +248,40 @@ class AESGCM:
         self._plaintext = plaintext
         """bytes: plaintext of any length"""
 
-        self._keystream_generator = self._get_keystream_generator(key, nonce)
-        """bytes: keystream generator object, yields encrypted counter blocks"""
+        assert len(key) == 16, "Key must be 16 bytes long"
+        self._nonce = nonce
+        """bytes: nonce, the upper 96 bits of every counter block"""
+
+        context = KEY_CACHE.get(key)
+        self._aes = context.aes
+        """algorithms.AES: the block cipher, shared by all modes"""
 
-        self._auth_tag_mask = next(self._keystream_generator)
+        self._ecb = context.ecb
+        """CipherContext: ECB encryptor for single blocks"""
+
+        self._auth_tag_mask = self._encrypt(
+            nonce + (1).to_bytes(length=4, byteorder="big")
+        )
         """bytes: auth tag mask, first encrypted counter block"""
 
-        self._auth_key = self._encrypt(key, b"\x00" * 16)
+        self._auth_key = context.auth_key
         """bytes: auth key, encrypted Null block"""
 
+        self._ghash_keys = context.ghash_keys(lanes)
+        """List[polynom.PolynomMultiplier]: multipliers for the powers of the auth key"""
+
+        self._stream_ghash = GHash(self._ghash_keys)
+        """GHash: running hash of the incremental interface"""
+
+        self._stream_encryptor = None
+        """CipherContext: CTR encryptor of the incremental interface, set by the first update"""
+
+        self._stream_lengths = [0, 0]
+        """List[int]: associated data and ciphertext length of the incremental interface"""
+
+        self._finalized = False
+        """bool: whether finalize() was called, the incremental interface is done then"""
+
         self._y0 = nonce + (1).to_bytes(length=4, byteorder="big")
         """only used for testing, not needed for encryption"""
 
@@ -44,48 +303,44 @@ class AESGCM:
         """
         return self._y0
 
-    def _encrypt(self, key: bytes, block: bytes) -> bytes:
-        """encrypts block with given key
+    def _encrypt(self, block: bytes) -> bytes:
+        """encrypts a single block with the key
 
         Args:
-            key (bytes): key
             block (bytes): block to encrypt
 
         Returns:
             bytes: encrypted block
         """
         assert len(block) == 16, "Block must be 16 bytes long"
-        assert len(key) == 16, "Key must be 16 bytes long"
-        encryptor = Cipher(algorithms.AES(key), modes.ECB()).encryptor()
-        return encryptor.update(block) + encryptor.finalize()
+        return self._ecb.update(block)
 
-    def _get_keystream_generator(self, key: bytes, nonce: bytes) -> bytes:
-        """function for returning keystream generator object
-
-        Args:
-            key (bytes): key
-            nonce (bytes): nonce
-
-        Returns:
-            bytes: keystream generator object
-        """
-        counter = 0
-        while True:
-            counter += 1
-            y = nonce + counter.to_bytes(length=4, byteorder="big")
-            yield self._encrypt(key, y)
+    def _apply_keystream(self, data: bytes, counter: int = 2) -> bytes:
+        """XORs data with the keystream of consecutive counter blocks
 
-    def encrypt_block(self, block: bytes) -> bytes:
-        """encrypts plaintext with generated y block
+        The counter blocks are encrypted and XORed in bulk by a CTR encryptor.
+        CTR increments all 128 bits, GCM only the lower 32, so the data is split
+        where the 32 bit counter wraps around.
 
         Args:
-            y (int): counter int
-            block (bytes): plaintext block
+            data (bytes): plaintext or ciphertext
+            counter (int, optional): counter of the first block. Defaults to 2.
 
         Returns:
-            bytes: encrypted block
+            bytes: data XOR keystream
         """
-        return bytes(a ^ b for a, b in zip(block, next(self._keystream_generator)))
+        # update_into needs room for one more block
+        output = bytearray(len(data) + 15)
+        view = memoryview(output)
+        position = 0
+        while position < len(data):
+            end = min(len(data), position + (2**32 - counter) * 16)
+            counter_block = self._nonce + counter.to_bytes(length=4, byteorder="big")
+            encryptor = Cipher(self._aes, modes.CTR(counter_block)).encryptor()
+            encryptor.update_into(data[position:end], view[position:])
+            position = end
+            counter = 0
+        return bytes(view[: len(data)])
 
     def gen_ciphertext(self) -> bytes:
         """function to generate ciphertext
@@ -93,10 +348,7 @@ class AESGCM:
         Returns:
             bytes: ciphertext
         """
-        ciphertext = b""
-        for i in range(-(len(self._plaintext) // -16)):
-            ciphertext += self.encrypt_block(self._plaintext[i * 16 : (i + 1) * 16])
-        return ciphertext
+        return self._apply_keystream(self._plaintext)
 
     def ghash(self, ciphertext: bytes) -> bytes:
         """function to generate ghash
@@ -107,21 +359,11 @@ class AESGCM:
         Returns:
             bytes: ghash
         """
-        adder = polynom.Polynom(0)
-        auth_key = polynom.Polynom.from_block(self._auth_key)
-        for input_list in [self._associated_data, ciphertext]:
-            for i in range(-(len(input_list) // -16)):
-                block = input_list[i * 16 : (i + 1) * 16]
-                if len(block) < 16:
-                    block += b"\x00" * (16 - len(block))
-                adder += polynom.Polynom.from_block(block)
-                adder *= auth_key
-        l = (len(self._associated_data) * 8).to_bytes(length=8, byteorder="big") + (
-            len(ciphertext) * 8
-        ).to_bytes(length=8, byteorder="big")
-        adder += polynom.Polynom.from_block(l)
-        adder *= auth_key
-        return adder.to_block()
+        ghash = GHash(self._ghash_keys)
+        ghash.update(self._associated_data)
+        ghash.pad()
+        ghash.update(ciphertext)
+        return ghash.digest(len(self._associated_data), len(ciphertext))
 
     def gen_auth_tag(self, ciphertext: bytes) -> bytes:
         """encrypts plaintext with given key, nonce and associated data
@@ -135,3 +377,71 @@ class AESGCM:
             self._auth_tag_mask
         ) + polynom.Polynom.from_block(self.ghash(ciphertext))
         return auth_tag.to_block()
+
+    def decrypt(self, ciphertext: bytes, auth_tag: bytes) -> Optional[bytes]:
+        """verifies the auth tag and decrypts the ciphertext
+
+        The tag only depends on the ciphertext, so forged messages are rejected
+        before any keystream is generated.
+
+        Args:
+            ciphertext (bytes): ciphertext
+            auth_tag (bytes): the received auth tag
+
+        Returns:
+            Optional[bytes]: plaintext, None if the auth tag does not match
+        """
+        if not hmac.compare_digest(self.gen_auth_tag(ciphertext), auth_tag):
+            return None
+        return self._apply_keystream(ciphertext)
+
+    def update_aad(self, associated_data: bytes) -> None:
+        """adds associated data, only allowed before the first update()
+
+        Args:
+            associated_data (bytes): the next piece of associated data
+        """
+        assert not self._finalized, "encryption already finalized"
+        assert (
+            self._stream_encryptor is None
+        ), "associated data must precede the plaintext"
+        self._stream_ghash.update(associated_data)
+        self._stream_lengths[0] += len(associated_data)
+
+    def update(self, plaintext: bytes) -> bytes:
+        """encrypts the next piece of plaintext
+
+        Args:
+            plaintext (bytes): the next piece of plaintext, of any length
+
+        Returns:
+            bytes: the ciphertext of the piece
+        """
+        assert not self._finalized, "encryption already finalized"
+        assert (
+            self._stream_lengths[1] + len(plaintext) <= MAX_PLAINTEXT_LENGTH
+        ), "plaintext too long for GCM"
+        if self._stream_encryptor is None:
+            self._stream_ghash.pad()
+            counter_block = self._nonce + (2).to_bytes(length=4, byteorder="big")
+            self._stream_encryptor = Cipher(
+                self._aes, modes.CTR(counter_block)
+            ).encryptor()
+        self._stream_lengths[1] += len(plaintext)
+        ciphertext = self._stream_encryptor.update(plaintext)
+        self._stream_ghash.update(ciphertext)
+        return ciphertext
+
+    def finalize(self) -> bytes:
+        """finishes the incremental encryption
+
+        Returns:
+            bytes: auth tag over all associated data and ciphertext passed in
+        """
+        assert not self._finalized, "encryption already finalized"
+        self._finalized = True
+        ghash = self._stream_ghash.digest(*self._stream_lengths)
+        auth_tag = polynom.Polynom.from_block(
+            self._auth_tag_mask
+        ) + polynom.Polynom.from_block(ghash)
+        return auth_tag.to_block()
@@ -1,28 +1,32 @@
 from . import meta_polynom, polynom, aesgcm
-from typing import Optional, List
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from typing import Optional, List, Union
 
 
 def cantor_zassenhaus(
-    f: meta_polynom.MetaPolynom, p: meta_polynom.MetaPolynom
+    f: Union[meta_polynom.MetaPolynom, meta_polynom.PolynomRing],
+    p: meta_polynom.MetaPolynom,
 ) -> Optional[tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]]:
     """Calculates two factors of a polynomial with cantor zassenhaus algorithm
 
     Args:
-        f (meta_polynom.MetaPolynom): factorization modulo
+        f (Union[meta_polynom.MetaPolynom, meta_polynom.PolynomRing]): factorization modulo,
+            or its PolynomRing to reuse the precomputed reduction
         p (meta_polynom.MetaPolynom): factorization polynom
 
     Returns:
         Optional[tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]]: two factors of the polynomial
     """
-    f = f.to_monic()
+    ring = f if isinstance(f, meta_polynom.PolynomRing) else meta_polynom.PolynomRing(f)
     p = p.to_monic()
     one = meta_polynom.MetaPolynom([polynom.Polynom(1)])
 
     q = 2**128
 
-    h = meta_polynom.MetaPolynom.rand_poly(len(f) - 1)
+    h = meta_polynom.MetaPolynom.rand_poly(ring.degree)
 
-    g = pow(h, ((q - 1) // 3), f) - one
+    g = pow(h, ((q - 1) // 3), ring) - one
 
     q = meta_polynom.MetaPolynom.gcd(p, g)
 
@@ -35,33 +39,184 @@ def cantor_zassenhaus(
         return None
 
 
-def find_zeros(f: meta_polynom.MetaPolynom) -> List[polynom.Polynom]:
-    """Finds the zeros of a polynomial with cantor zassenhaus algorithm
+def trace_split(
+    f: Union[meta_polynom.MetaPolynom, meta_polynom.PolynomRing],
+    p: meta_polynom.MetaPolynom,
+) -> Optional[tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]]:
+    """Calculates two factors of a product of distinct linear factors with the trace map
+
+    The absolute trace Tr(z) = sum(z^(2^i) for i < 128) maps GF(2^128) onto {0, 1}.
+    gcd(p, Tr(dX)) collects the roots r with Tr(dr) = 0, which for a random d
+    are about half of them.
+
+    Args:
+        f (Union[meta_polynom.MetaPolynom, meta_polynom.PolynomRing]): factorization modulo,
+            or its PolynomRing to reuse the precomputed reduction
+        p (meta_polynom.MetaPolynom): factorization polynom, a divisor of f
+
+    Returns:
+        Optional[tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]]: two factors of the polynomial
+    """
+    ring = f if isinstance(f, meta_polynom.PolynomRing) else meta_polynom.PolynomRing(f)
+    p = p.to_monic()
+    delta = polynom.Polynom.rand_polynom()
+    power = ring.reduce(meta_polynom.MetaPolynom([polynom.Polynom.ZERO, delta]))
+    trace = power
+    for _ in range(127):
+        power = ring.square(power)
+        trace = trace + power
+
+    k1 = meta_polynom.MetaPolynom.gcd(p, trace)
+
+    if 1 < len(k1) < len(p):
+        k2 = p // k1
+        return (k1, k2.to_monic())
+    else:
+        return None
+
+
+def linear_factors(f: meta_polynom.MetaPolynom) -> meta_polynom.MetaPolynom:
+    """Calculates the product of the distinct linear factors of a polynomial
+
+    Every element of GF(2^128) is a root of X^(2^128) - X, so gcd(f, X^(2^128) - X)
+    keeps exactly the roots of f and drops non-linear irreducible factors.
 
     Args:
         f (meta_polynom.MetaPolynom): The polynomial
 
     Returns:
-        List[polynom.Polynom]: The zeros of the polynomial
+        meta_polynom.MetaPolynom: the monic product of the linear factors
+    """
+    x = meta_polynom.MetaPolynom([polynom.Polynom.ZERO, polynom.Polynom.ONE])
+    ring = meta_polynom.PolynomRing(
+        f, frobenius=len(f) - 1 < meta_polynom.PolynomRing.FROBENIUS_THRESHOLD
+    )
+    # 128 modular squarings
+    frobenius = pow(x, 2**128, ring)
+    return meta_polynom.MetaPolynom.gcd(f, frobenius - x)
+
+
+def split_factors(
+    p: meta_polynom.MetaPolynom,
+) -> tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]:
+    """Splits a product of at least two distinct linear factors, retrying until it succeeds
+
+    Args:
+        p (meta_polynom.MetaPolynom): the product, monic
+
+    Returns:
+        tuple[meta_polynom.MetaPolynom, meta_polynom.MetaPolynom]: two monic factors
     """
-    zeros: List[polynom.Polynom] = [f]
-    while any([len(zero) > 2 for zero in zeros]):
+    ring = meta_polynom.PolynomRing(p, frobenius=True)
+    result = None
+    while result is None:
+        result = trace_split(ring, p)
+    return result
+
 
-        for zero in zeros:
-            if len(zero) > 2:
-                p = zero
+@functools.lru_cache(maxsize=1)
+def _artin_schreier_basis() -> dict[int, tuple[int, int]]:
+    """Builds an echelon basis of the GF(2)-linear map y -> y^2 + y on GF(2^128)
+
+    Returns:
+        dict[int, tuple[int, int]]: for every pivot bit an image and one of its preimages
+    """
+    basis: dict[int, tuple[int, int]] = {}
+    for bit in range(128):
+        preimage = 1 << bit
+        image = polynom.Polynom._square(preimage) ^ preimage
+        while image:
+            pivot = image.bit_length() - 1
+            if pivot not in basis:
+                basis[pivot] = (image, preimage)
                 break
-        result = cantor_zassenhaus(f, p)
-        if result is not None:
-            k1, k2 = result
-            zeros.remove(p)
-            zeros.append(k1)
-            zeros.append(k2)
-    return [zero[0] for zero in zeros]
+            image ^= basis[pivot][0]
+            preimage ^= basis[pivot][1]
+    return basis
+
+
+def solve_quadratic(p: meta_polynom.MetaPolynom) -> List[polynom.Polynom]:
+    """Finds the roots of a polynomial of degree at most 2 directly
+
+    X^2 + bX + c becomes y^2 + y = c / b^2 with X = by. In GF(2^128) that is solvable
+    iff Tr(c / b^2) = 0, the solution comes from the precomputed echelon basis of
+    y -> y^2 + y, the second root is y + 1.
+
+    Args:
+        p (meta_polynom.MetaPolynom): the polynomial
+
+    Returns:
+        List[polynom.Polynom]: the distinct roots
+    """
+    assert len(p) <= 3, "solve_quadratic needs a degree of at most 2"
+    p = p.to_monic()
+    if len(p) < 2:
+        return []
+    if len(p) == 2:
+        return [p[0]]
+    c, b = p[0], p[1]
+    if b == polynom.Polynom.ZERO:
+        # X^2 + c = (X + sqrt(c))^2, squaring 128 times is the identity
+        return [c ** (2**127)]
+    z = (c / (b * b)).polynom
+    y = 0
+    basis = _artin_schreier_basis()
+    while z:
+        pivot = z.bit_length() - 1
+        if pivot not in basis:
+            # Tr(c / b^2) = 1, irreducible
+            return []
+        z ^= basis[pivot][0]
+        y ^= basis[pivot][1]
+    return [b * polynom.Polynom(y), b * polynom.Polynom(y ^ 1)]
+
+
+def roots_of_linear_factors(p: meta_polynom.MetaPolynom) -> List[polynom.Polynom]:
+    """Finds the roots of a product of distinct linear factors
+
+    Every factor is split recursively, doing arithmetic modulo that factor only,
+    so the splits get cheaper the smaller the factors are.
+
+    Args:
+        p (meta_polynom.MetaPolynom): the product, monic
+
+    Returns:
+        List[polynom.Polynom]: the roots
+    """
+    if len(p) <= 3:
+        return solve_quadratic(p)
+    k1, k2 = split_factors(p)
+    return roots_of_linear_factors(k1) + roots_of_linear_factors(k2)
+
+
+def find_zeros(f: meta_polynom.MetaPolynom, workers: int = 1) -> List[polynom.Polynom]:
+    """Finds the zeros of a polynomial by splitting it with the trace map
+
+    Args:
+        f (meta_polynom.MetaPolynom): The polynomial
+        workers (int, optional): number of processes splitting independent factors.
+            Defaults to 1.
+
+    Returns:
+        List[polynom.Polynom]: The zeros of the polynomial
+    """
+    if len(f) <= 3:
+        return solve_quadratic(f)
+    # only the linear factors hold zeros, split just their product
+    factors = [linear_factors(f)]
+    if workers <= 1:
+        return roots_of_linear_factors(factors[0])
+    # split the largest factor until every worker has an independent subtree
+    while len(factors) < workers and len(factors[0]) > 2:
+        factors.extend(split_factors(factors.pop(0)))
+        factors.sort(key=len, reverse=True)
+    with ProcessPoolExecutor(workers) as executor:
+        zeros = executor.map(roots_of_linear_factors, factors)
+        return [zero for subtree in zeros for zero in subtree]
 
 
 def simple_ghash(
-    auth_key: polynom.Polynom, ciphertext: bytes, associated_data: bytes
+    auth_key: polynom.Polynom, ciphertext: bytes, associated_data: bytes, lanes: int = 1
 ) -> polynom.Polynom:
     """Calculates a q block of GCM
 
@@ -69,27 +224,23 @@ def simple_ghash(
         auth_key (polynom.Polynom): auth_key from message
         ciphertext (bytes): message ciphertext
         associated_data (bytes): message associated_data
+        lanes (int, optional): number of blocks absorbed per GHASH step. Defaults to 1.
 
     Returns:
         polynom.Polynom: the q block as polynom
     """
-    adder = polynom.Polynom(0)
-    for input_list in [associated_data, ciphertext]:
-        for i in range(-(len(input_list) // -16)):
-            block = input_list[i * 16 : (i + 1) * 16]
-            if len(block) < 16:
-                block += b"\x00" * (16 - len(block))
-            adder += polynom.Polynom.from_block(block)
-            adder *= auth_key
-    l = (len(associated_data) * 8).to_bytes(length=8, byteorder="big") + (
-        len(ciphertext) * 8
-    ).to_bytes(length=8, byteorder="big")
-    adder += polynom.Polynom.from_block(l)
-    adder *= auth_key
-    return adder
-
-
-def gcm_recover(msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> bytes:
+    ghash = aesgcm.GHash(aesgcm.ghash_keys(auth_key, lanes))
+    ghash.update(associated_data)
+    ghash.pad()
+    ghash.update(ciphertext)
+    return polynom.Polynom.from_block(
+        ghash.digest(len(associated_data), len(ciphertext))
+    )
+
+
+def gcm_recover(
+    msg1: dict, msg2: dict, msg3: dict, msg4: dict, workers: int = 1
+) -> bytes:
     """Recovers the auth tag of a GCM message
 
     Args:
@@ -97,6 +248,7 @@ def gcm_recover(msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> bytes:
         msg2 (dict): The second message
         msg3 (dict): The third message
         msg4 (dict): The fourth message without auth_tag
+        workers (int, optional): number of processes finding the zeros. Defaults to 1.
 
     Returns:
         bytes: The recovered auth_tag
@@ -106,11 +258,7 @@ def gcm_recover(msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> bytes:
     for msg in [msg1, msg2]:
         q: List[polynom.Polynom] = []
         for input_list in [msg["associated_data"], msg["ciphertext"]]:
-            for i in range(-(len(input_list) // -16)):
-                block = input_list[i * 16 : (i + 1) * 16]
-                if len(block) < 16:
-                    block += b"\x00" * (16 - len(block))
-                q.append(polynom.Polynom.from_block(block))
+            q.extend(polynom.Polynom.from_blocks(input_list))
         l = (len(msg["associated_data"]) * 8).to_bytes(length=8, byteorder="big") + (
             len(msg["ciphertext"]) * 8
         ).to_bytes(length=8, byteorder="big")
@@ -125,7 +273,7 @@ def gcm_recover(msg1: dict, msg2: dict, msg3: dict, msg4: dict) -> bytes:
         msg1["auth_tag"]
     ) + polynom.Polynom.from_block(msg2["auth_tag"])
     f = meta_polynom.MetaPolynom(f_coeffs)
-    h_candidates = find_zeros(f)
+    h_candidates = find_zeros(f, workers)
     assert len(h_candidates) > 0, "no h candidates found"
     for h in h_candidates:
         ek_y0 = simple_ghash(
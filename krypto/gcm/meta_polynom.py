@@ -1,14 +1,53 @@
 from . import polynom
-from typing import Optional
+from itertools import zip_longest
+from typing import Optional, Union
+
+_multiply = polynom.Polynom._multiply
+_square = polynom.Polynom._square
 
 
 class MetaPolynom:
+    __slots__ = ("_coefficients",)
+
+    KARATSUBA_THRESHOLD = 16
+    """int: factors with at most this many coefficients are multiplied with the schoolbook method"""
+
     def __init__(self, coefficients: list[polynom.Polynom]):
         """Initializes a MetaPolynom without leading zeros"""
-        while len(coefficients) > 0 and coefficients[-1] == polynom.Polynom(0):
+        self._coefficients: list[int] = [
+            coefficient.polynom for coefficient in coefficients
+        ]
+        """coefficients == polynom.Polynom, stored as their integer representation"""
+        self._strip()
+
+    @staticmethod
+    def _from_ints(coefficients: list[int]) -> "MetaPolynom":
+        """Creates a MetaPolynom from integer coefficients, taking ownership of the list
+
+        Args:
+            coefficients (list[int]): the coefficients in integer representation
+
+        Returns:
+            MetaPolynom: the polynomial without leading zeros
+        """
+        out = MetaPolynom.__new__(MetaPolynom)
+        out._coefficients = coefficients
+        out._strip()
+        return out
+
+    def _strip(self) -> None:
+        """Removes leading zero coefficients in place"""
+        coefficients = self._coefficients
+        while coefficients and coefficients[-1] == 0:
             coefficients.pop()
-        self._coefficients: list[polynom.Polynom] = coefficients
-        """coefficients == polynom.Polynom"""
+
+    def copy(self) -> "MetaPolynom":
+        """Returns a copy, which can be changed in place independently
+
+        Returns:
+            MetaPolynom: the copy
+        """
+        return MetaPolynom._from_ints(self._coefficients[:])
 
     def __len__(self) -> int:
         """Returns number of coefficients"""
@@ -24,9 +63,9 @@ class MetaPolynom:
             polynom.Polynom: the coefficient
         """
         return (
-            self._coefficients[index]
+            polynom.Polynom(self._coefficients[index])
             if index < len(self._coefficients)
-            else polynom.Polynom(0)
+            else polynom.Polynom.ZERO
         )
 
     def __iter__(self) -> iter:
@@ -35,7 +74,7 @@ class MetaPolynom:
         Returns:
             iter: the iterator
         """
-        return iter(self._coefficients)
+        return map(polynom.Polynom, self._coefficients)
 
     def __eq__(a: "MetaPolynom", b: "MetaPolynom") -> bool:
         """Checks if two polynomials are equal
@@ -57,7 +96,10 @@ class MetaPolynom:
         """
         if len(self) == 0:
             return self
-        return self // MetaPolynom([self._coefficients[-1]])
+        inverse = polynom.Polynom._inverse(self._coefficients[-1])
+        return MetaPolynom._from_ints(
+            [_multiply(coefficient, inverse) for coefficient in self._coefficients]
+        )
 
     def __add__(summand_a: "MetaPolynom", summand_b: "MetaPolynom") -> "MetaPolynom":
         """Adds two polynomials
@@ -69,10 +111,25 @@ class MetaPolynom:
         Returns:
             MetaPolynom: The sum of the polynomials as MetaPolynom
         """
-        out = []
-        for i in range(max(len(summand_a), len(summand_b))):
-            out.append(summand_a[i] + summand_b[i])
-        return MetaPolynom(out)
+        return summand_a.copy().__iadd__(summand_b)
+
+    def __iadd__(self, summand: "MetaPolynom") -> "MetaPolynom":
+        """Adds a polynomial in place
+
+        Args:
+            summand (MetaPolynom): the summand
+
+        Returns:
+            MetaPolynom: self, holding the sum
+        """
+        coefficients = self._coefficients
+        other = summand._coefficients
+        if len(other) > len(coefficients):
+            coefficients.extend([0] * (len(other) - len(coefficients)))
+        for index, coefficient in enumerate(other):
+            coefficients[index] ^= coefficient
+        self._strip()
+        return self
 
     def __sub__(minuend: "MetaPolynom", subtrahend: "MetaPolynom") -> "MetaPolynom":
         """Subtracts two polynomials
@@ -85,6 +142,17 @@ class MetaPolynom:
         """
         return minuend + subtrahend
 
+    def __isub__(self, subtrahend: "MetaPolynom") -> "MetaPolynom":
+        """Subtracts a polynomial in place
+
+        Args:
+            subtrahend (MetaPolynom): the subtrahend
+
+        Returns:
+            MetaPolynom: self, holding the difference
+        """
+        return self.__iadd__(subtrahend)
+
     def __mul__(factor_a: "MetaPolynom", factor_b: "MetaPolynom") -> "MetaPolynom":
         """Multiplies two polynomials
 
@@ -95,11 +163,66 @@ class MetaPolynom:
         Returns:
             MetaPolynom: The product of the polynomials
         """
-        out = [polynom.Polynom(0)] * (len(factor_a) + len(factor_b) - 1)
-        for i in range(len(factor_a)):
-            for j in range(len(factor_b)):
-                out[i + j] += factor_a[i] * factor_b[j]
-        return MetaPolynom(out)
+        return MetaPolynom._from_ints(
+            MetaPolynom._multiply_coefficients(
+                factor_a._coefficients, factor_b._coefficients
+            )
+        )
+
+    @staticmethod
+    def _multiply_coefficients(a: list[int], b: list[int]) -> list[int]:
+        """Multiplies two coefficient lists, with karatsuba above KARATSUBA_THRESHOLD
+
+        Args:
+            a (list[int]): coefficients of the first factor
+            b (list[int]): coefficients of the second factor
+
+        Returns:
+            list[int]: coefficients of the product, possibly with leading zeros
+        """
+        if len(a) < len(b):
+            a, b = b, a
+        if not b:
+            return []
+        out = [0] * (len(a) + len(b) - 1)
+        if len(b) <= MetaPolynom.KARATSUBA_THRESHOLD:
+            for i, coefficient_a in enumerate(a):
+                if coefficient_a == 0:
+                    continue
+                for j, coefficient_b in enumerate(b):
+                    out[i + j] ^= _multiply(coefficient_a, coefficient_b)
+            return out
+        half = len(a) // 2
+        if len(b) <= half:
+            # unbalanced factors, only split the longer one
+            products = [(0, MetaPolynom._multiply_coefficients(a[:half], b))]
+            products.append((half, MetaPolynom._multiply_coefficients(a[half:], b)))
+        else:
+            # (a0 + a1 x^h)(b0 + b1 x^h) = z0 + (z1 - z0 - z2) x^h + z2 x^2h
+            a0, a1, b0, b1 = a[:half], a[half:], b[:half], b[half:]
+            z0 = MetaPolynom._multiply_coefficients(a0, b0)
+            z2 = MetaPolynom._multiply_coefficients(a1, b1)
+            z1 = MetaPolynom._multiply_coefficients(
+                [x ^ y for x, y in zip_longest(a0, a1, fillvalue=0)],
+                [x ^ y for x, y in zip_longest(b0, b1, fillvalue=0)],
+            )
+            products = [(0, z0), (half, z0), (half, z1), (half, z2), (2 * half, z2)]
+        for shift, product in products:
+            for index, coefficient in enumerate(product):
+                out[shift + index] ^= coefficient
+        return out
+
+    def __imul__(self, factor: "MetaPolynom") -> "MetaPolynom":
+        """Multiplies by a polynomial in place
+
+        Args:
+            factor (MetaPolynom): the factor
+
+        Returns:
+            MetaPolynom: self, holding the product
+        """
+        self._coefficients = (self * factor)._coefficients
+        return self
 
     def __divmod__(
         numerator: "MetaPolynom", denominator: "MetaPolynom"
@@ -113,16 +236,25 @@ class MetaPolynom:
         Returns:
             tuple[MetaPolynom, MetaPolynom]: The quotient and the remainder of the division
         """
-        quotient = [polynom.Polynom(0)] * (len(numerator) - len(denominator) + 1)
-        remainder = numerator
-        while len(remainder) >= len(denominator):
-            factor = remainder[len(remainder) - 1] / denominator[len(denominator) - 1]
-            quotient[len(remainder) - len(denominator)] = factor
-            remainder -= (
-                MetaPolynom(quotient[: len(remainder) - len(denominator) + 1])
-                * denominator
-            )
-        return MetaPolynom(quotient), MetaPolynom(remainder)
+        divisor = denominator._coefficients
+        if not divisor:
+            raise ZeroDivisionError("polynomial division by zero")
+        degree = len(divisor) - 1
+        remainder = numerator._coefficients[:]
+        quotient = [0] * max(0, len(remainder) - degree)
+        # monic divisors need no inversion, others only one
+        lead_inverse = polynom.Polynom._inverse(divisor[-1])
+        for position in range(len(quotient) - 1, -1, -1):
+            factor = remainder[position + degree]
+            if factor == 0:
+                continue
+            if lead_inverse != 1:
+                factor = _multiply(factor, lead_inverse)
+            quotient[position] = factor
+            for index in range(degree):
+                remainder[position + index] ^= _multiply(factor, divisor[index])
+        del remainder[degree:]
+        return MetaPolynom._from_ints(quotient), MetaPolynom._from_ints(remainder)
 
     def __mod__(dividend_mod: "MetaPolynom", modulo: "MetaPolynom") -> "MetaPolynom":
         """Calculates the remainder of the division of two polynomials
@@ -136,6 +268,18 @@ class MetaPolynom:
         """
         return divmod(dividend_mod, modulo)[1]
 
+    def __imod__(self, modulo: "MetaPolynom") -> "MetaPolynom":
+        """Reduces the polynomial in place
+
+        Args:
+            modulo (MetaPolynom): The modulo to be divided by
+
+        Returns:
+            MetaPolynom: self, holding the remainder
+        """
+        self._coefficients = (self % modulo)._coefficients
+        return self
+
     def __floordiv__(dividend: "MetaPolynom", divisor: "MetaPolynom") -> "MetaPolynom":
         """Calculates the quotient of the division of two polynomials
 
@@ -149,27 +293,33 @@ class MetaPolynom:
         return divmod(dividend, divisor)[0]
 
     def __pow__(
-        base: "MetaPolynom", exponent: int, modulo: Optional["MetaPolynom"] = None
+        base: "MetaPolynom",
+        exponent: int,
+        modulo: Optional[Union["MetaPolynom", "PolynomRing"]] = None,
     ) -> "MetaPolynom":
         """Raises a polynomial to a power
 
         Args:
             base (MetaPolynom): The polynomial to be raised to a power
             exponent (int): The power
-            modulo (Optional[MetaPolynom], optional): The modulo. Defaults to None.
+            modulo (Optional[Union[MetaPolynom, PolynomRing]], optional): The modulo, or a
+                PolynomRing to reuse its precomputation. Defaults to None.
 
         Returns:
             MetaPolynom: The power of the polynomial
         """
-        out = MetaPolynom([polynom.Polynom(1)])
+        if modulo is not None:
+            ring = modulo if isinstance(modulo, PolynomRing) else PolynomRing(modulo)
+            return ring.pow(base, exponent)
+        out = MetaPolynom._from_ints([1])
+        # the caller's base must not change, the in place operations work on a copy
+        base = base.copy()
         while exponent > 0:
             if exponent % 2 == 1:
                 out *= base
-            base *= base
             exponent //= 2
-            if modulo is not None:
-                out %= modulo
-                base %= modulo
+            if exponent > 0:
+                base *= base
         return out
 
     def gcd(a: "MetaPolynom", b: "MetaPolynom") -> "MetaPolynom":
@@ -195,7 +345,187 @@ class MetaPolynom:
         Returns:
             Polynom: the random polynom
         """
-        poly = []
-        for _ in range(length):
-            poly.append(polynom.Polynom.rand_polynom())
-        return MetaPolynom(poly)
+        return MetaPolynom._from_ints(
+            [polynom.Polynom.rand_polynom().polynom for _ in range(length)]
+        )
+
+
+class PolynomRing:
+    """Arithmetic modulo a fixed MetaPolynom
+
+    Precomputes what reducing products modulo f needs, so repeated reductions
+    against the same f, e.g. in modular exponentiation, need no division.
+    Small moduli reduce with a table of x^i mod f, large ones with a Barrett
+    reciprocal, which profits from karatsuba multiplication.
+
+    Squaring is linear in characteristic 2. With frobenius enabled, the ring
+    also keeps x^2i mod f for every i < deg f, so a modular square is a linear
+    combination of those rows instead of a square followed by a reduction.
+    Callers should only enable it below FROBENIUS_THRESHOLD.
+    """
+
+    BARRETT_THRESHOLD = 96
+    """int: moduli of at least this degree use barrett reduction"""
+
+    FROBENIUS_THRESHOLD = 224
+    """int: the frobenius matrix only pays off for moduli below this degree, above it
+    a square with d^2 / 2 field multiplications loses against karatsuba and barrett"""
+
+    def __init__(self, modulo: MetaPolynom, frobenius: bool = False):
+        """Precomputes the reduction of the given modulo
+
+        Args:
+            modulo (MetaPolynom): the modulo f
+            frobenius (bool, optional): precompute the squaring matrix. Defaults to False.
+        """
+        if len(modulo) == 0:
+            raise ZeroDivisionError("polynomial ring modulo zero")
+        self.modulo: MetaPolynom = modulo.to_monic()
+        """MetaPolynom: the monic modulo f, its remainders equal those of the given modulo"""
+
+        self.degree: int = len(self.modulo) - 1
+        """int: degree of f, reduced polynomials have fewer coefficients"""
+
+        tail = self.modulo._coefficients[: self.degree]
+        self._reciprocal: list[int] = []
+        """list[int]: x^(2 * degree) // f, for barrett reduction"""
+
+        self._powers: list[list[int]] = []
+        """list[list[int]]: x^i mod f for degree <= i < 2 * degree, for table reduction"""
+
+        if self.degree >= PolynomRing.BARRETT_THRESHOLD:
+            power = MetaPolynom._from_ints([0] * 2 * self.degree + [1])
+            self._reciprocal = (power // self.modulo)._coefficients
+        elif self.degree > 0:
+            # x^degree == tail, every further power shifts by one and folds the top back
+            power = tail
+            for _ in range(self.degree):
+                self._powers.append(power)
+                top = power[-1]
+                power = [0] + power[:-1]
+                if top:
+                    power = [x ^ _multiply(top, y) for x, y in zip(power, tail)]
+
+        self._squares: list[list[int]] = []
+        """list[list[int]]: x^2i mod f for (degree + 1) // 2 <= i < degree, the frobenius rows,
+        the lower ones are just x^2i"""
+
+        if frobenius and self.degree > 0:
+            # every row is the previous one times x^2, shifted and folded like _powers
+            power = [0] * (self.degree - 1) + [1]
+            exponent = self.degree - 1
+            for index in range((self.degree + 1) // 2, self.degree):
+                while exponent < 2 * index:
+                    top = power[-1]
+                    power = [0] + power[:-1]
+                    if top:
+                        power = [x ^ _multiply(top, y) for x, y in zip(power, tail)]
+                    exponent += 1
+                self._squares.append(power)
+
+    def _reduce(self, coefficients: list[int]) -> list[int]:
+        """Reduces coefficients modulo f
+
+        Args:
+            coefficients (list[int]): the coefficients, not changed
+
+        Returns:
+            list[int]: the coefficients of the remainder, possibly with leading zeros
+        """
+        degree = self.degree
+        if len(coefficients) <= degree:
+            return coefficients
+        if degree == 0:
+            return []
+        if len(coefficients) > 2 * degree:
+            return (MetaPolynom._from_ints(coefficients[:]) % self.modulo)._coefficients
+        if self._reciprocal:
+            quotient = MetaPolynom._multiply_coefficients(
+                coefficients[degree:], self._reciprocal
+            )[degree:]
+            product = MetaPolynom._multiply_coefficients(
+                quotient, self.modulo._coefficients
+            )
+            return [x ^ y for x, y in zip(coefficients[:degree], product)]
+        out = coefficients[:degree]
+        for power, coefficient in zip(self._powers, coefficients[degree:]):
+            if coefficient:
+                for index, value in enumerate(power):
+                    out[index] ^= _multiply(coefficient, value)
+        return out
+
+    def reduce(self, a: MetaPolynom) -> MetaPolynom:
+        """Reduces a polynomial modulo f
+
+        Args:
+            a (MetaPolynom): the polynomial
+
+        Returns:
+            MetaPolynom: the remainder
+        """
+        return MetaPolynom._from_ints(self._reduce(a._coefficients)[:])
+
+    def multiply(self, factor_a: MetaPolynom, factor_b: MetaPolynom) -> MetaPolynom:
+        """Multiplies two polynomials modulo f
+
+        Args:
+            factor_a (MetaPolynom): first factor, reduced
+            factor_b (MetaPolynom): second factor, reduced
+
+        Returns:
+            MetaPolynom: the reduced product
+        """
+        return MetaPolynom._from_ints(
+            self._reduce(
+                MetaPolynom._multiply_coefficients(
+                    factor_a._coefficients, factor_b._coefficients
+                )
+            )
+        )
+
+    def square(self, a: MetaPolynom) -> MetaPolynom:
+        """Squares a polynomial modulo f
+
+        The square of sum(a_i x^i) is sum(a_i^2 x^2i), the cross terms cancel out.
+
+        Args:
+            a (MetaPolynom): the polynomial, reduced
+
+        Returns:
+            MetaPolynom: the reduced square
+        """
+        coefficients = a._coefficients
+        if not self._squares:
+            spread = [0] * max(0, 2 * len(coefficients) - 1)
+            spread[::2] = [_square(coefficient) for coefficient in coefficients]
+            return MetaPolynom._from_ints(self._reduce(spread))
+        start = (self.degree + 1) // 2
+        low = coefficients[:start]
+        out = [0] * self.degree
+        out[: 2 * len(low) : 2] = [_square(coefficient) for coefficient in low]
+        for row, coefficient in zip(self._squares, coefficients[start:]):
+            if coefficient:
+                coefficient = _square(coefficient)
+                for index, value in enumerate(row):
+                    out[index] ^= _multiply(coefficient, value)
+        return MetaPolynom._from_ints(out)
+
+    def pow(self, base: MetaPolynom, exponent: int) -> MetaPolynom:
+        """Raises a polynomial to a power modulo f
+
+        Args:
+            base (MetaPolynom): the base
+            exponent (int): the exponent
+
+        Returns:
+            MetaPolynom: the reduced power
+        """
+        out = self.reduce(MetaPolynom._from_ints([1]))
+        base = self.reduce(base)
+        while exponent > 0:
+            if exponent % 2 == 1:
+                out = self.multiply(out, base)
+            exponent //= 2
+            if exponent > 0:
+                base = self.square(base)
+        return out
@@ -1,11 +1,27 @@
+import functools
+import operator
 import random
 from typing import List
 
+_BIT_REVERSE = bytes(int(format(byte, "08b")[::-1], 2) for byte in range(256))
+"""bytes: translation table reversing the bit order of every byte"""
+
+_MASK = (1 << 128) - 1
+"""int: mask of the 128 coefficients of a reduced polynom"""
+
 
 class Polynom:
     REDUCTION_POLYNOM = 1 << 128 | 1 << 7 | 1 << 2 | 1 << 1 | 1 << 0
     # REDUCTION_POLYNOM = 0x100000000000000000000000000000087
 
+    __slots__ = ("polynom",)
+
+    ZERO: "Polynom"
+    """Polynom: the constant 0, shared since polynoms are never changed in place"""
+
+    ONE: "Polynom"
+    """Polynom: the constant 1"""
+
     def __init__(self, polynom: int):
         self.polynom: int = polynom
 
@@ -16,7 +32,35 @@ class Polynom:
         Returns:
             Polynom: the inverse of the polynom
         """
-        return self ** (2**128 - 2)
+        return Polynom(Polynom._inverse(self.polynom))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _inverse(polynom: int) -> int:
+        """Calculates the inverse with the extended euclidean algorithm for binary polynoms
+
+        Memoized, since divisions often repeat the same divisor.
+
+        Args:
+            polynom (int): the polynom to invert, the inverse of 0 is 0
+
+        Returns:
+            int: the inverse of the polynom
+        """
+        if polynom == 0:
+            return 0
+        # invariants: u == g1 * polynom and v == g2 * polynom, modulo the reduction polynom
+        u, v = polynom, Polynom.REDUCTION_POLYNOM
+        g1, g2 = 1, 0
+        while u != 1:
+            shift = u.bit_length() - v.bit_length()
+            if shift < 0:
+                u, v = v, u
+                g1, g2 = g2, g1
+                shift = -shift
+            u ^= v << shift
+            g1 ^= g2 << shift
+        return g1
 
     @staticmethod
     def from_block(block: bytes) -> "Polynom":
@@ -28,13 +72,26 @@ class Polynom:
         Returns:
             Polynom: integer representation of the polynom
         """
-        polynom = 0
-        for index in range(128):
-            byte_index = index // 8
-            bit_index = 7 - (index % 8)
-            if (block[byte_index] >> bit_index) & 1:
-                polynom |= 1 << index
-        return Polynom(polynom)
+        # bit 7 of byte 0 is x^0, so reversing every byte gives a little endian integer
+        return Polynom(int.from_bytes(block.translate(_BIT_REVERSE), "little"))
+
+    @staticmethod
+    def from_blocks(buffer: bytes) -> List["Polynom"]:
+        """Converts a buffer to a list of polynomials, one per block of GCM
+
+        A last incomplete block is padded with zeros.
+
+        Args:
+            buffer (bytes): the buffer, e.g. a whole ciphertext
+
+        Returns:
+            List[Polynom]: the polynom of every block
+        """
+        reversed_buffer = buffer.translate(_BIT_REVERSE)
+        return [
+            Polynom(int.from_bytes(reversed_buffer[index : index + 16], "little"))
+            for index in range(0, len(reversed_buffer), 16)
+        ]
 
     def to_exponents(self) -> List[int]:
         """Converts a polynomial to a list of exponents
@@ -42,11 +99,8 @@ class Polynom:
         Returns:
             List[int]: list of exponents
         """
-        exponents = []
-        for index in range(128):
-            if (self.polynom >> index) & 1:
-                exponents.append(index)
-        return exponents
+        bits = format(self.polynom, "b")[::-1]
+        return [index for index, bit in enumerate(bits) if bit == "1"]
 
     def from_exponents(exponents: List[int]) -> "Polynom":
         """Converts a list of exponents to a polynomial
@@ -68,13 +122,7 @@ class Polynom:
         Returns:
             bytes: the block
         """
-        block = bytearray(16)
-        for index in range(128):
-            byte_index = index // 8
-            bit_index = 7 - (index % 8)
-            if (self.polynom >> index) & 1:
-                block[byte_index] |= 1 << bit_index
-        return bytes(block)
+        return self.polynom.to_bytes(16, "little").translate(_BIT_REVERSE)
 
     def __eq__(self, other: "Polynom") -> bool:
         """Method to compare two polynoms
@@ -121,19 +169,72 @@ class Polynom:
         Returns:
             Polynom: the product of the polynoms
         """
+        return Polynom(Polynom._multiply(factor_a.polynom, factor_b.polynom))
+
+    @staticmethod
+    def _multiply(factor_a: int, factor_b: int) -> int:
+        """Multiplies two polynoms given as integers
+
+        Carryless comb multiplication processing 4 bits of one factor per step,
+        the 255 bit product is only reduced once at the end.
+
+        Args:
+            factor_a (int): first factor
+            factor_b (int): second factor
+
+        Returns:
+            int: the reduced product
+        """
+        if factor_a.bit_length() < factor_b.bit_length():
+            factor_a, factor_b = factor_b, factor_a
+        if factor_b == 0:
+            return 0
+        # every multiple of factor_a by a polynom of degree < 4
+        a2 = factor_a << 1
+        a4 = factor_a << 2
+        a8 = factor_a << 3
+        window = [
+            0, factor_a, a2, a2 ^ factor_a,
+            a4, a4 ^ factor_a, a4 ^ a2, a4 ^ a2 ^ factor_a,
+            a8, a8 ^ factor_a, a8 ^ a2, a8 ^ a2 ^ factor_a,
+            a8 ^ a4, a8 ^ a4 ^ factor_a, a8 ^ a4 ^ a2, a8 ^ a4 ^ a2 ^ factor_a,
+        ]  # fmt: skip
         product = 0
-        a_factor = factor_a.polynom
-        b_factor = factor_b.polynom
-        # implemented russian peasant multiplication algorithm
-        # https://en.wikipedia.org/wiki/Finite_field_arithmetic#C_programming_example
-        while a_factor != 0 and b_factor != 0:
-            if b_factor & 1:
-                product ^= a_factor
-            a_factor <<= 1
-            if a_factor >> 128:
-                a_factor ^= Polynom.REDUCTION_POLYNOM
-            b_factor >>= 1
-        return Polynom(product)
+        for shift in range((factor_b.bit_length() - 1) & ~3, -1, -4):
+            product = (product << 4) ^ window[(factor_b >> shift) & 0xF]
+        return Polynom._reduce(product)
+
+    @staticmethod
+    def _square(polynom: int) -> int:
+        """Squares a polynom given as integer
+
+        Squaring is linear in characteristic 2, the square of sum(a_i x^i)
+        is sum(a_i x^2i), i.e. the bits spread apart by a zero each.
+
+        Args:
+            polynom (int): the polynom
+
+        Returns:
+            int: the reduced square
+        """
+        return Polynom._reduce(int("0".join(format(polynom, "b")), 2))
+
+    @staticmethod
+    def _reduce(product: int) -> int:
+        """Reduces a product of two polynoms modulo the reduction polynom
+
+        x^128 is congruent to x^7 + x^2 + x + 1, so the upper half is folded down
+        with shifts, the few bits still overflowing are folded with _REDUCTION_TABLE.
+
+        Args:
+            product (int): the unreduced product, less than 256 bits
+
+        Returns:
+            int: the reduced product
+        """
+        high = product >> 128
+        folded = (product & _MASK) ^ high ^ (high << 1) ^ (high << 2) ^ (high << 7)
+        return (folded & _MASK) ^ _REDUCTION_TABLE[folded >> 128]
 
     def __truediv__(numerator: "Polynom", denumerator: "Polynom") -> "Polynom":
         """Method to divide two polynoms
@@ -176,3 +277,83 @@ class Polynom:
             Polynom: the random polynom
         """
         return Polynom(random.getrandbits(Polynom.REDUCTION_POLYNOM.bit_length() - 1))
+
+
+Polynom.ZERO = Polynom(0)
+Polynom.ONE = Polynom(1)
+
+_REDUCTION_TABLE: List[int] = [
+    functools.reduce(
+        operator.xor,
+        [
+            (Polynom.REDUCTION_POLYNOM ^ 1 << 128) << bit
+            for bit in range(8)
+            if overflow >> bit & 1
+        ],
+        0,
+    )
+    for overflow in range(256)
+]
+"""List[int]: overflow * x^128 reduced, for every overflow of less than 8 bits"""
+
+
+class PolynomMultiplier:
+    """Multiplies polynoms by a fixed factor with precomputed tables
+
+    The other factor is split into windows of `bits` bits. For every window
+    position there is a table holding the product of the fixed factor with
+    every possible window value, so a multiplication is one lookup per window
+    and XORs, instead of one shift and reduction per bit.
+    """
+
+    def __init__(self, factor: Polynom, bits: int = 8):
+        """Precomputes the tables for the fixed factor
+
+        Args:
+            factor (Polynom): the fixed factor, e.g. the GHASH auth key H
+            bits (int, optional): window size, 4 or 8 bits. Defaults to 8.
+        """
+        assert bits in (4, 8), "window size must be 4 or 8 bits"
+        self.factor: Polynom = factor
+        """Polynom: the fixed factor"""
+
+        self._bits: int = bits
+        """int: number of bits per window"""
+
+        # factor * x^i for every bit i of the other factor
+        basis = []
+        value = factor.polynom
+        for _ in range(128):
+            basis.append(value)
+            value <<= 1
+            if value >> 128:
+                value ^= Polynom.REDUCTION_POLYNOM
+
+        self._tables: List[List[int]] = []
+        """List[List[int]]: product of the factor with every value of every window"""
+        for window in range(128 // bits):
+            table = [0] * (1 << bits)
+            for entry in range(1, 1 << bits):
+                lowest = entry & -entry
+                table[entry] = (
+                    table[entry ^ lowest]
+                    ^ basis[window * bits + lowest.bit_length() - 1]
+                )
+            self._tables.append(table)
+
+    def multiply(self, other: Polynom) -> Polynom:
+        """Multiplies the fixed factor with another polynom
+
+        Args:
+            other (Polynom): the other factor
+
+        Returns:
+            Polynom: the product of the polynoms
+        """
+        value = other.polynom
+        mask = (1 << self._bits) - 1
+        product = 0
+        for table in self._tables:
+            product ^= table[value & mask]
+            value >>= self._bits
+        return Polynom(product)
@@ -1,6 +1,6 @@
 import base64
 import pytest
-from krypto.gcm import aesgcm
+from krypto.gcm import aesgcm, gcm_encrypt, polynom
 
 
 @pytest.fixture
@@ -38,3 +38,111 @@ def test_generate_auth_tag_gcm(gcm):
         "QoMewiF3dCRLciG3hNDUnOOqIS8sAqTgNcF+IymsoS4h1RSyVGaTHH2PalqshKoF"
     )
     assert gcm.gen_auth_tag(ciphertext) == auth_tag
+
+
+def test_keystream_counter_wraps(gcm):
+    data = bytes(range(48))
+    keystream = b"".join(
+        gcm._encrypt(gcm.y0[:12] + counter.to_bytes(4, "big"))
+        for counter in [2**32 - 1, 0, 1]
+    )
+    expected = bytes(a ^ b for a, b in zip(data, keystream))
+    assert gcm._apply_keystream(data, 2**32 - 1) == expected
+
+
+def test_incremental_update(gcm):
+    ciphertext = gcm.gen_ciphertext()
+    streamed = aesgcm.AESGCM(base64.b64decode("/v/pkoZlcxxtao+UZzCDCA=="), gcm._nonce)
+    streamed.update_aad(b"")
+    chunks = [streamed.update(gcm._plaintext[i : i + 7]) for i in range(0, 48, 7)]
+    assert b"".join(chunks) == ciphertext
+    assert streamed.finalize() == gcm.gen_auth_tag(ciphertext)
+
+
+def test_update_aad_after_update(gcm):
+    gcm.update(b"data")
+    with pytest.raises(AssertionError):
+        gcm.update_aad(b"late")
+
+
+def test_reuse_after_finalize(gcm):
+    gcm.update(b"data")
+    gcm.finalize()
+    with pytest.raises(AssertionError):
+        gcm.finalize()
+    with pytest.raises(AssertionError):
+        gcm.update(b"more")
+    with pytest.raises(AssertionError):
+        gcm.update_aad(b"more")
+
+
+def test_decrypt(gcm):
+    ciphertext = gcm.gen_ciphertext()
+    auth_tag = gcm.gen_auth_tag(ciphertext)
+    assert gcm.decrypt(ciphertext, auth_tag) == gcm._plaintext
+    forged = bytes([ciphertext[0] ^ 1]) + ciphertext[1:]
+    assert gcm.decrypt(forged, auth_tag) is None
+    assert gcm.decrypt(ciphertext, auth_tag[:-1] + bytes([auth_tag[-1] ^ 1])) is None
+
+
+@pytest.mark.parametrize("lanes", [2, 3, 8])
+def test_ghash_lanes(gcm, lanes):
+    ciphertext = bytes(range(200)) * 3
+    multilane = aesgcm.AESGCM(
+        base64.b64decode("/v/pkoZlcxxtao+UZzCDCA=="),
+        gcm._nonce,
+        b"associated",
+        lanes=lanes,
+    )
+    sequential = aesgcm.AESGCM(
+        base64.b64decode("/v/pkoZlcxxtao+UZzCDCA=="), gcm._nonce, b"associated"
+    )
+    assert multilane.ghash(ciphertext) == sequential.ghash(ciphertext)
+
+
+def test_key_cache():
+    cache = aesgcm.KeyCache(maxsize=2)
+    keys = [bytes([i]) * 16 for i in range(3)]
+    first = cache.get(keys[0])
+    assert cache.get(keys[0]) is first
+    cache.get(keys[1])
+    cache.get(keys[0])
+    cache.get(keys[2])
+    assert keys[1] not in cache and keys[0] in cache and len(cache) == 2
+    assert (cache.hits, cache.misses) == (2, 3)
+    cache.evict(keys[0])
+    assert keys[0] not in cache
+    cache.maxsize = 0
+    assert len(cache) == 0
+    cache.get(keys[2])
+    assert len(cache) == 0 and cache.misses == 4
+
+
+def test_key_context_lanes():
+    context = aesgcm.KeyContext(bytes(16))
+    keys = context.ghash_keys(4)
+    assert len(keys) == 4 and context.ghash_keys(2) == keys[:2]
+    auth_key = polynom.Polynom.from_block(context.auth_key)
+    assert keys[3].factor == auth_key * auth_key * auth_key * auth_key
+
+
+def test_update_too_long(gcm, monkeypatch):
+    monkeypatch.setattr(aesgcm, "MAX_PLAINTEXT_LENGTH", 32)
+    gcm.update(bytes(16))
+    with pytest.raises(AssertionError):
+        gcm.update(bytes(17))
+    assert gcm.update(bytes(16)) == gcm._apply_keystream(bytes(32))[16:]
+
+
+@pytest.mark.parametrize(
+    "arguments",
+    [
+        {},
+        {"plaintext": "", "plaintext_file": "-"},
+        {"plaintext_file": "-"},
+        {"plaintext": "", "ciphertext_file": "out"},
+    ],
+)
+def test_gcm_encrypt_arguments(arguments):
+    with pytest.raises(ValueError):
+        gcm_encrypt("/v/pkoZlcxxtao+UZzCDCA==", "yv66vvrO263eyviI", "", **arguments)
@@ -1,5 +1,7 @@
-from krypto.gcm import base64_to_MetaPolynom, cantor
+from krypto.gcm import MetaPolynom, Polynom, base64_to_MetaPolynom, cantor
+from krypto.gcm.meta_polynom import PolynomRing
 import base64
+import pytest
 
 
 def test_cantor():
@@ -45,3 +47,136 @@ def test_zeros():
     zeros = [x.to_block() for x in zeros]
     zeros = [base64.b64encode(x).decode() for x in zeros]
     assert set(zeros) == set(p)
+
+
+def test_meta_polynom_in_place():
+    a = base64_to_MetaPolynom(["epw0AAAaWEuymwoDt5cZhA==", "G4HAAAAAAKnZXBcAJtBZYA=="])
+    b = base64_to_MetaPolynom(["9DgAAAAAAAAAxF6Rz9wSHg==", "gAAAAAAAAAAAAAAAAAAAAA=="])
+    a_copy = a.copy()
+    assert a**3 == a * a * a
+    assert a == a_copy
+    a += b
+    assert a == a_copy + b
+    a *= b
+    assert a == (a_copy + b) * b
+    a %= a_copy
+    assert a == ((a_copy + b) * b) % a_copy
+    a -= a
+    assert len(a) == 0
+
+
+def test_karatsuba(monkeypatch):
+    a = MetaPolynom.rand_poly(70)
+    b = MetaPolynom.rand_poly(45)
+    c = MetaPolynom.rand_poly(9)
+    monkeypatch.setattr(MetaPolynom, "KARATSUBA_THRESHOLD", 4)
+    products = [a * b, b * a, a * c, a * a]
+    monkeypatch.setattr(MetaPolynom, "KARATSUBA_THRESHOLD", 1000)
+    assert products == [a * b, b * a, a * c, a * a]
+
+
+def test_divmod():
+    a = MetaPolynom.rand_poly(40)
+    b = MetaPolynom.rand_poly(15)
+    quotient, remainder = divmod(a, b)
+    assert quotient * b + remainder == a
+    assert len(remainder) < len(b)
+    assert divmod(b, a) == (MetaPolynom([]), b)
+    with pytest.raises(ZeroDivisionError):
+        divmod(a, MetaPolynom([]))
+
+
+@pytest.mark.parametrize("barrett_threshold", [1, 1000])
+def test_polynom_ring(monkeypatch, barrett_threshold):
+    monkeypatch.setattr(PolynomRing, "BARRETT_THRESHOLD", barrett_threshold)
+    f = MetaPolynom.rand_poly(8)
+    a = MetaPolynom.rand_poly(15)
+    ring = PolynomRing(f)
+    assert ring.reduce(a) == a % f
+    assert ring.multiply(a % f, a % f) == (a * a) % f
+    expected = MetaPolynom([Polynom(1)])
+    for _ in range(11):
+        expected = (expected * a) % f
+    assert pow(a, 11, ring) == expected
+    assert pow(a, 11, f) == expected
+
+
+@pytest.mark.parametrize("frobenius", [False, True])
+def test_polynom_ring_square(frobenius):
+    for degree in [1, 2, 7, 8]:
+        f = MetaPolynom.rand_poly(degree + 1)
+        a = MetaPolynom.rand_poly(degree)
+        ring = PolynomRing(f, frobenius)
+        assert ring.square(a) == (a * a) % f
+        short = MetaPolynom.rand_poly(min(2, degree))
+        assert ring.square(short) == (short * short) % f
+        assert pow(a, 2**128, ring) == pow(a, 2**128, f)
+
+
+def _irreducible_quadratic() -> MetaPolynom:
+    """Draws random monic quadratics until one has no roots"""
+    while True:
+        quadratic = MetaPolynom.rand_poly(2) + MetaPolynom(
+            [Polynom(0), Polynom(0), Polynom(1)]
+        )
+        if len(cantor.linear_factors(quadratic)) == 1:
+            return quadratic
+
+
+def test_linear_factors():
+    roots = [Polynom.rand_polynom() for _ in range(3)]
+    linear = MetaPolynom([Polynom(1)])
+    for root in roots:
+        linear *= MetaPolynom([root, Polynom(1)])
+    quadratic = _irreducible_quadratic()
+    f = linear * quadratic * MetaPolynom([roots[0], Polynom(1)])
+    assert cantor.linear_factors(f) == linear
+    zeros = cantor.find_zeros(f)
+    assert sorted(zero.polynom for zero in zeros) == sorted(
+        root.polynom for root in roots
+    )
+
+
+def test_trace_split():
+    f = base64_to_MetaPolynom(
+        [
+            "epw0AAAaWEuymwoDt5cZhA==",
+            "G4HAAAAAAKnZXBcAJtBZYA==",
+            "9DgAAAAAAAAAxF6Rz9wSHg==",
+            "AAAAAAAAAAAAAAAA3m34+A==",
+            "gAAAAAAAAAAAAAAAAAAAAA==",
+        ]
+    )
+    for i in range(100):
+        x = cantor.trace_split(f, f)
+        if x is not None:
+            break
+    assert x is not None
+    assert x[0] * x[1] == f.to_monic()
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_find_zeros_workers(workers):
+    roots = [Polynom.rand_polynom() for _ in range(6)]
+    # the cofactor has no roots, so the zeros are exactly the chosen roots
+    f = _irreducible_quadratic()
+    for root in roots:
+        f *= MetaPolynom([root, Polynom(1)])
+    zeros = cantor.find_zeros(f, workers)
+    assert sorted(zero.polynom for zero in zeros) == sorted(
+        root.polynom for root in roots
+    )
+
+
+def test_solve_quadratic():
+    r1, r2, c = Polynom.rand_polynom(), Polynom.rand_polynom(), Polynom.rand_polynom()
+    linear = MetaPolynom([r1 * c, c])
+    assert cantor.solve_quadratic(linear) == [r1]
+    quadratic = MetaPolynom([r1, Polynom(1)]) * MetaPolynom([r2, Polynom(1)])
+    quadratic *= MetaPolynom([c])
+    zeros = cantor.solve_quadratic(quadratic)
+    assert sorted(zero.polynom for zero in zeros) == sorted([r1.polynom, r2.polynom])
+    square = MetaPolynom([r1, Polynom(1)]) * MetaPolynom([r1, Polynom(1)])
+    assert cantor.solve_quadratic(square) == [r1]
+    irreducible = _irreducible_quadratic()
+    assert cantor.solve_quadratic(irreducible) == []
@@ -28,3 +28,29 @@ def test_polynomial_arithmetic():
     a = polynom.Polynom.from_block(base64.b64decode("jjYoD6kfN+/Y/g4Hl991Cw=="))
     b = polynom.Polynom.from_block(base64.b64decode("tQsToM4bzOQtot/1w4x8PA=="))
     assert a * b == polynom.Polynom.from_block(base64.b64decode("khnvYitpTW8Sv3ZUmFqasw=="))
+
+
+def test_polynom_multiplier():
+    a = polynom.Polynom.from_block(base64.b64decode("jjYoD6kfN+/Y/g4Hl991Cw=="))
+    b = polynom.Polynom.from_block(base64.b64decode("tQsToM4bzOQtot/1w4x8PA=="))
+    expected = polynom.Polynom.from_block(base64.b64decode("khnvYitpTW8Sv3ZUmFqasw=="))
+    for bits in (4, 8):
+        assert polynom.PolynomMultiplier(a, bits).multiply(b) == expected
+
+
+def test_polynomial_from_blocks():
+    buffer = base64.b64decode("jjYoD6kfN+/Y/g4Hl991C7ULE6DOG8zkLaLf9cOMfDyS")
+    expected = [
+        polynom.Polynom.from_block(buffer[:16]),
+        polynom.Polynom.from_block(buffer[16:32]),
+        polynom.Polynom.from_block(buffer[32:] + b"\x00" * 15),
+    ]
+    assert polynom.Polynom.from_blocks(buffer) == expected
+    assert [x.to_block() for x in expected[:2]] == [buffer[:16], buffer[16:32]]
+
+
+def test_polynomial_inverse():
+    a = polynom.Polynom.from_block(base64.b64decode("jjYoD6kfN+/Y/g4Hl991Cw=="))
+    assert a * a.inverse == polynom.Polynom(1)
+    assert a.inverse == a ** (2**128 - 2)
+    assert polynom.Polynom(1).inverse == polynom.Polynom(1)
@@ -1,4 +1,24 @@
+import base64
+import json
+import os
+import pathlib
+import pytest
 from krypto import bytenigma
+from krypto.bytenigma import parallel, stream, vectorized
+
+DATA = pathlib.Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture
+def example():
+    with open(DATA / "example.json") as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def example_output():
+    with open(DATA / "example_output.json") as f:
+        return json.load(f)
 
 
 def test_inverse_rotors():
@@ -28,11 +48,148 @@ def test_rotors_encrypt():
     )
 
 
-# TODO: test bytenigma with example.json and example_output.json
-# def test_bytenigma():
-#     rotors =  [
-#         [ 169, 240, 17, 218, 156, 74, 211, 46, 109, 15, 4, 236, 255, 172, 139, 161, 62, 145, 55, 9, 94, 97, 210, 182, 23, 197, 134, 194, 216, 253, 217, 149, 128, 61, 116, 183, 69, 135, 241, 133, 89, 123, 179, 245, 178, 80, 21, 113, 158, 22, 57, 222, 108, 75, 79, 195, 41, 144, 142, 76, 77, 42, 12, 32, 90, 103, 129, 136, 248, 246, 159, 243, 131, 37, 78, 87, 226, 36, 10, 247, 107, 224, 221, 66, 8, 225, 147, 244, 167, 104, 176, 92, 202, 132, 122, 189, 20, 151, 35, 16, 47, 214, 0, 212, 95, 232, 239, 242, 39, 175, 204, 56, 38, 96, 64, 98, 138, 73, 192, 166, 115, 196, 174, 119, 19, 235, 154, 72, 117, 48, 160, 99, 186, 164, 126, 53, 26, 249, 91, 100, 111, 181, 203, 105, 252, 124, 18, 88, 171, 208, 60, 227, 49, 81, 114, 199, 59, 30, 230, 237, 229, 63, 71, 70, 219, 130, 54, 40, 165, 233, 254, 3, 86, 193, 207, 127, 106, 68, 153, 162, 82, 31, 24, 102, 140, 34, 5, 205, 28, 215, 6, 50, 2, 110, 168, 184, 85, 29, 170, 7, 137, 150, 163, 198, 58, 43, 33, 180, 251, 148, 191, 13, 157, 231, 25, 67, 84, 228, 250, 93, 185, 173, 11, 200, 52, 155, 83, 209, 141, 125, 118, 238, 51, 234, 14, 146, 223, 143, 1, 220, 187, 190, 112, 201, 206, 27, 152, 213, 101, 65, 44, 121, 188, 177, 120, 45 ],
-#         [ 229, 0, 106, 253, 254, 33, 47, 171, 186, 56, 15, 191, 212, 122, 194, 103, 240, 62, 136, 81, 228, 172, 187, 154, 38, 175, 26, 7, 242, 50, 77, 113, 80, 163, 138, 46, 111, 5, 146, 143, 75, 71, 28, 155, 1, 94, 150, 206, 216, 25, 74, 23, 197, 6, 20, 174, 183, 21, 153, 40, 24, 220, 236, 182, 8, 66, 116, 41, 192, 217, 31, 96, 100, 78, 184, 214, 176, 131, 200, 76, 232, 156, 104, 205, 230, 193, 160, 48, 245, 203, 10, 45, 95, 117, 65, 180, 101, 177, 215, 222, 18, 59, 219, 35, 36, 198, 201, 64, 207, 226, 167, 224, 249, 43, 178, 223, 112, 86, 233, 208, 85, 90, 4, 128, 34, 120, 227, 199, 92, 102, 69, 173, 49, 218, 243, 83, 239, 244, 247, 210, 61, 118, 251, 2, 32, 27, 105, 44, 142, 12, 169, 9, 123, 88, 73, 110, 29, 188, 141, 126, 54, 248, 170, 168, 209, 181, 179, 91, 231, 189, 58, 225, 125, 255, 252, 70, 152, 37, 51, 144, 124, 14, 16, 84, 161, 234, 166, 119, 107, 11, 22, 109, 55, 139, 42, 162, 97, 241, 238, 39, 89, 133, 148, 250, 213, 145, 157, 137, 68, 67, 129, 135, 99, 53, 57, 211, 202, 140, 195, 221, 115, 52, 149, 79, 190, 108, 134, 132, 17, 3, 164, 87, 246, 151, 237, 185, 93, 127, 196, 82, 204, 63, 121, 235, 98, 13, 30, 114, 19, 147, 130, 165, 60, 72, 159, 158 ],
-#         [ 33, 90, 105, 220, 76, 63, 47, 12, 204, 192, 34, 77, 69, 188, 62, 185, 223, 217, 68, 145, 54, 89, 119, 232, 8, 137, 53, 249, 16, 17, 133, 32, 151, 140, 171, 194, 197, 87, 148, 205, 235, 203, 78, 253, 61, 44, 166, 234, 25, 164, 72, 120, 67, 186, 14, 142, 238, 97, 121, 73, 49, 210, 115, 35, 224, 85, 233, 131, 107, 218, 236, 41, 144, 241, 143, 13, 209, 116, 5, 240, 38, 51, 242, 250, 4, 52, 10, 175, 254, 201, 79, 3, 229, 27, 22, 213, 158, 50, 225, 81, 37, 99, 215, 65, 154, 75, 251, 200, 125, 248, 152, 132, 226, 239, 246, 74, 86, 46, 18, 94, 130, 113, 161, 117, 102, 173, 103, 43, 21, 88, 9, 190, 36, 178, 124, 112, 59, 177, 122, 92, 80, 30, 198, 118, 127, 95, 138, 211, 108, 70, 155, 189, 176, 146, 170, 20, 56, 230, 244, 1, 147, 160, 157, 31, 57, 156, 182, 98, 23, 150, 7, 169, 199, 237, 129, 212, 228, 163, 26, 181, 245, 183, 167, 15, 19, 106, 64, 180, 11, 134, 179, 100, 101, 42, 162, 96, 40, 58, 111, 60, 71, 231, 48, 207, 184, 247, 196, 24, 208, 222, 221, 28, 128, 84, 227, 139, 109, 6, 174, 187, 149, 153, 214, 136, 195, 110, 191, 123, 39, 219, 252, 91, 216, 165, 0, 172, 168, 202, 159, 141, 135, 83, 243, 82, 55, 66, 114, 93, 126, 104, 255, 193, 2, 29, 206, 45 ]
-#     ]
-#     output = bytenigma.bytenigma(rotors, b"Hello World!")
+@pytest.mark.parametrize("engine", bytenigma.ENGINES)
+def test_bytenigma_example(engine, example, example_output):
+    assert (
+        bytenigma.bytenigma(example["rotors"], example["input"], engine)
+        == example_output
+    )
+
+
+def test_rotor_positions():
+    rotors = [[0, 4, 1, 3, 2], [0, 3, 4, 1, 2], [4, 3, 0, 2, 1]]
+    turn_list = [0, 0, 0]
+    expected = []
+    for _ in range(200):
+        expected.append(list(turn_list))
+        bytenigma.turn_rotors(rotors, turn_list)
+    assert vectorized.rotor_positions(rotors, 0, 200).T.tolist() == expected
+
+
+def test_bytenigma_vectorized(example):
+    rotors = example["rotors"]
+    inp = os.urandom(3 * vectorized.BLOCK_SIZE + 17)
+    assert vectorized.bytenigma_vectorized(rotors, inp) == bytenigma.bytenigma_loop(
+        rotors, inp
+    )
+
+
+def test_rotor_schedule():
+    rotors = [[0, 4, 1, 3, 2], [0, 3, 4, 1, 2], [4, 3, 0, 2, 1]]
+    turn_list = [3, 0, 4]
+    expected = []
+    for _ in range(300):
+        expected.append(list(turn_list))
+        bytenigma.turn_rotors(rotors, turn_list)
+    schedule = []
+    for start, length, turns in bytenigma.rotor_schedule(rotors, 300, [3, 0, 4]):
+        assert start == len(schedule)
+        for index in range(length):
+            schedule.append([(turns[0] + index) % 5] + turns[1:])
+    assert schedule == expected
+
+
+def test_notch_carries():
+    rotor = [0, 4, 1, 3, 2]
+    turn_list = [2, 0]
+    for steps in range(20):
+        assert bytenigma.notch_carries(rotor, 2, steps) == turn_list[1]
+        bytenigma.turn_rotors([rotor, list(range(100))], turn_list)
+
+
+def test_seek_rotors():
+    rotors = [[0, 4, 1, 3, 2], [0, 3, 4, 1, 2], [4, 3, 0, 2, 1]]
+    turn_list = [1, 2, 3]
+    for steps in range(200):
+        assert bytenigma.seek_rotors(rotors, steps, [1, 2, 3]) == turn_list
+        bytenigma.turn_rotors(rotors, turn_list)
+
+
+@pytest.mark.parametrize("engine", bytenigma.ENGINES)
+def test_bytenigma_offset(engine, example, example_output):
+    expected = base64.b64decode(example_output["output"])
+    tail = base64.b64encode(base64.b64decode(example["input"])[5:]).decode()
+    output = bytenigma.bytenigma(example["rotors"], tail, engine, offset=5)["output"]
+    assert base64.b64decode(output) == expected[5:]
+
+
+@pytest.mark.parametrize("engine", bytenigma.ENGINES)
+def test_bytenigma_parallel(engine, monkeypatch, example):
+    monkeypatch.setattr(parallel, "PARALLEL_THRESHOLD", 0)
+    rotors = example["rotors"]
+    inp = os.urandom(1000)
+    expected = bytenigma.ENGINES[engine](rotors, inp, 7)
+    output = parallel.bytenigma_parallel(bytenigma.ENGINES[engine], rotors, inp, 7, 3)
+    assert output == expected
+
+
+def test_rotor_cache(example):
+    rotors = example["rotors"] * 4
+    reverse_rotors = bytenigma.rotor_reverse_init(rotors)
+    cache = bytenigma.RotorCache(rotors)
+    inp = os.urandom(70000)
+    turn_list = [0] * len(rotors)
+    expected = bytearray()
+    for byte in inp:
+        expected.append(
+            bytenigma.rotors_encrypt(rotors, reverse_rotors, turn_list, byte)
+        )
+        bytenigma.turn_rotors(rotors, turn_list)
+    output = bytearray()
+    for start, length, turns in bytenigma.rotor_schedule(rotors, len(inp)):
+        output += cache.encrypt_run(turns, inp[start : start + length])
+    assert output == expected
+
+
+def test_b64_chunks():
+    data = os.urandom(1000)
+    encoded = base64.b64encode(data).decode()
+    chunks = list(stream.b64decode_chunks(encoded, 30))
+    assert b"".join(chunks) == data
+    assert "".join(stream.b64encode_chunks(chunks[:3] + [b"x", b"yz"])) == (
+        base64.b64encode(data[:90] + b"xyz").decode()
+    )
+
+
+def test_b64_chunks_wrapped():
+    data = os.urandom(1000)
+    encoded = base64.b64encode(data).decode()
+    wrapped = "\n".join(
+        encoded[start : start + 76] for start in range(0, len(encoded), 76)
+    )
+    for chunk_size in [30, 57, 999]:
+        chunks = list(stream.b64decode_chunks(wrapped + "\n", chunk_size))
+        assert b"".join(chunks) == data
+        assert all(len(chunk) == chunk_size for chunk in chunks[:-1])
+
+
+def test_bytenigma_stream(monkeypatch, example, example_output):
+    monkeypatch.setattr(bytenigma, "STREAM_CHUNK_SIZE", 9)
+    assert bytenigma.bytenigma(example["rotors"], example["input"]) == example_output
+
+
+def test_bytenigma_stream_workers(monkeypatch, example, example_output):
+    monkeypatch.setattr(parallel, "PARALLEL_THRESHOLD", 0)
+    monkeypatch.setattr(bytenigma, "STREAM_CHUNK_SIZE", 9)
+    wrapped = "\n".join(
+        example["input"][start : start + 8] for start in range(0, 64, 8)
+    )
+    wrapped += example["input"][64:]
+    output = bytenigma.bytenigma(example["rotors"], wrapped, workers=2)
+    assert output == example_output
+
+
+def test_bytenigma_batch(example, example_output):
+    expected = base64.b64decode(example_output["output"])
+    inp = base64.b64decode(example["input"])
+    inputs = [
+        {"input": example["input"]},
+        {"input": base64.b64encode(inp[3:10]).decode(), "offset": 3},
+        {"input": base64.b64encode(inp[:4]).decode(), "offset": 0},
+    ]
+    outputs = bytenigma.bytenigma_batch(example["rotors"], inputs)["outputs"]
+    assert [base64.b64decode(output) for output in outputs] == [
+        expected,
+        expected[3:10],
+        expected[:4],
+    ]